@@ -4,8 +4,29 @@ Configuration Schema and Validator
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from pathlib import Path
+from functools import lru_cache
+import copy
+import os
+import warnings
 import yaml
 
+try:
+    # libyaml-backed loader, roughly 10x faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+    warnings.warn(
+        "PyYAML was built without libyaml; falling back to the slower "
+        "pure-Python loader. Reinstall with: pip install --force-reinstall pyyaml"
+    )
+
+
+@lru_cache(maxsize=16)
+def _load_yaml_cached(config_path: str, mtime: float) -> Dict:
+    """Parse a YAML file once per (path, mtime); edits invalidate the entry"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 
 @dataclass
 class ChunkingConfig:
@@ -24,6 +45,12 @@ class EmbeddingConfig:
     timeout: int = 30
     cache_folder: Optional[str] = None  # For local embeddings
     use_gpu: bool = True  # For local embeddings
+    storage_dtype: str = "fp32"  # fp32, fp16 or int8 (quantized) for exported vectors
+    max_concurrency: int = 8  # Concurrent API requests (OpenAI)
+    cache_embeddings: bool = False  # Reuse embeddings of unchanged chunks between runs
+    batch_api: bool = False  # Use the OpenAI Batch API (half price, up to 24h turnaround)
+    worker_process: bool = False  # Host the local model in a subprocess, pipelining batches
+    local_batch_size: Optional[int] = None  # Local encode batch size (None = tuned per device)
 
 
 @dataclass
@@ -39,7 +66,11 @@ class CodeProcessingConfig:
     extensions: List[str] = field(default_factory=lambda: [".js", ".jsx", ".ts", ".tsx"])
     ignore_dirs: List[str] = field(default_factory=lambda: ["node_modules", ".git"])
     ignore_files: List[str] = field(default_factory=lambda: ["package-lock.json"])
+    ignore_patterns: List[str] = field(default_factory=list)  # Gitignore-style (needs pathspec)
+    use_gitignore: bool = True  # Also skip paths ignored by the source tree's .gitignore
     chunking: ChunkingConfig = field(default_factory=ChunkingConfig)
+    cpu_workers: int = 0  # Processes for analysis/chunking (0 = in-process, -1 = per CPU core)
+    io_workers: int = 16  # Threads for reading/processing files when cpu_workers == 0
 
 
 @dataclass
@@ -57,14 +88,19 @@ class Config:
     @classmethod
     def from_yaml(cls, config_path: str) -> 'Config':
         """Load configuration from YAML file"""
-        with open(config_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        config_path = os.path.abspath(config_path)
+        # Deep copy so callers never mutate the cached parse
+        data = copy.deepcopy(
+            _load_yaml_cached(config_path, os.path.getmtime(config_path))
+        )
         
         # Extract embedding config and filter valid fields
         embedding_data = data.get('embedding', {})
         embedding_config = {
             k: v for k, v in embedding_data.items()
-            if k in ['provider', 'model', 'batch_size', 'max_retries', 'timeout', 'cache_folder', 'use_gpu']
+            if k in ['provider', 'model', 'batch_size', 'max_retries', 'timeout', 'cache_folder', 'use_gpu',
+                     'storage_dtype', 'max_concurrency', 'cache_embeddings', 'batch_api',
+                     'worker_process', 'local_batch_size']
         }
         
         return cls(
@@ -74,7 +110,11 @@ class Config:
                 extensions=data['code_processing']['extensions'],
                 ignore_dirs=data['code_processing']['ignore_dirs'],
                 ignore_files=data['code_processing']['ignore_files'],
-                chunking=ChunkingConfig(**data['code_processing']['chunking'])
+                ignore_patterns=data['code_processing'].get('ignore_patterns') or [],
+                use_gitignore=data['code_processing'].get('use_gitignore', True),
+                chunking=ChunkingConfig(**data['code_processing']['chunking']),
+                cpu_workers=data['code_processing'].get('cpu_workers', 0),
+                io_workers=data['code_processing'].get('io_workers', 16)
             ),
             embedding=EmbeddingConfig(**embedding_config),
             metadata=data.get('metadata', {}),
@@ -91,5 +131,14 @@ class Config:
         if self.code_processing.chunking.chunk_size < 100:
             raise ValueError("Chunk size must be at least 100")
         
+        if self.code_processing.cpu_workers < -1:
+            raise ValueError("cpu_workers must be -1 (one per CPU core), 0 or a process count")
+        
+        if self.embedding.storage_dtype not in ('fp32', 'fp16', 'int8'):
+            raise ValueError(
+                f"Unknown storage_dtype: {self.embedding.storage_dtype}. "
+                f"Supported: 'fp32', 'fp16', 'int8'"
+            )
+        
         return True
 
@@ -81,23 +81,39 @@ def main():
         # Initialize vectorizer
         vectorizer = CodeVectorizer(config, logger)
         
+        exporter = VectorExporter(config, logger)
+        
+        # Incremental runs reuse unchanged files and embeddings of the last export
+        prior = None
+        if config.export.get('incremental', False):
+            prior = exporter.load_prior()
+        
         # Process codebase
-        chunks = vectorizer.process_codebase()
+        chunks = vectorizer.process_codebase(prior_files=prior.files if prior else None)
         
         if args.dry_run:
             logger.info("🔍 Dry run complete")
             logger.info(f"Stats: {vectorizer.get_stats()}")
             return
         
-        # Generate embeddings
-        if not args.skip_embeddings:
-            chunks = vectorizer.generate_embeddings(chunks)
-        else:
-            logger.warning("⚠️  Skipping embeddings generation")
+        prior_embeddings = prior.embeddings if prior else None
         
-        # Export
-        exporter = VectorExporter(config, logger)
-        output_file = exporter.export(chunks)
+        if not args.skip_embeddings and config.export['format'] == 'jsonl':
+            # Write lines while embeddings are still being generated
+            with exporter.streaming_jsonl_sink() as writer:
+                vectorizer.generate_embeddings(
+                    chunks, sink=writer.submit, prior=prior_embeddings
+                )
+            output_file = str(writer.output_file)
+        else:
+            # Generate embeddings
+            if not args.skip_embeddings:
+                chunks = vectorizer.generate_embeddings(chunks, prior=prior_embeddings)
+            else:
+                logger.warning("⚠️  Skipping embeddings generation")
+            
+            # Export
+            output_file = exporter.export(chunks)
         
         logger.info("=" * 60)
         logger.success("🎉 Knowledge base creation complete!")
@@ -29,7 +29,10 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "python-dotenv>=1.0.0",
-        "pyyaml>=6.0.1",
+        "pyyaml>=6.0.1",  # Wheels bundle libyaml (CSafeLoader)
+        "numpy>=1.24.0",  # Embedding matrices, fp16/int8 storage, .npy sidecars
+        "orjson>=3.9.0",  # Fast JSON export (stdlib json fallback)
+        "pathspec>=0.12.0",  # ignore_patterns and .gitignore support
         "openai>=1.12.0",
         "tiktoken>=0.5.2",
         "tenacity>=8.2.3",
@@ -1,11 +1,31 @@
 """
 Intelligent code chunking strategies
 """
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from pathlib import Path
 import re
 
 
+# Start of a top-level declaration (cut points for JavaScript/TypeScript)
+_BOUNDARY_RE = re.compile(
+    r'^(?:export\s+)?(?:default\s+)?(?:async\s+)?'
+    r'(?:function|class|const|let|var|interface|type|enum)\b',
+    re.M
+)
+
+# Tokens tracked while looking for cut points. Comments and string/template
+# literals are consumed whole so braces or declarations inside them are
+# ignored; a '}' in column 0 closes every open block, which recovers from
+# braces the scan can't see through (e.g. inside regex literals).
+_SCAN_RE = re.compile(
+    r'(?P<skip>//[^\n]*|/\*.*?\*/'
+    r'|\'(?:[^\'\\\n]|\\.)*\'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)'
+    r'|(?P<reset>^\})|(?P<open>\{)|(?P<close>\})'
+    r'|(?P<boundary>' + _BOUNDARY_RE.pattern + r')',
+    re.M | re.S
+)
+
+
 class ChunkStrategy:
     """Base class for chunking strategies"""
     
@@ -23,13 +43,16 @@ class SmartCodeChunker(ChunkStrategy):
     def chunk(self, content: str, metadata: Dict) -> List[Dict]:
         """Chunk code intelligently"""
         
+        # Header is identical for every chunk of the file except the index
+        header = self._chunk_header(metadata)
+        
         # Try to split by logical blocks first
         if metadata.get('extension') in ['.js', '.jsx', '.ts', '.tsx']:
-            return self._chunk_javascript(content, metadata)
+            return self._chunk_javascript(content, metadata, header)
         else:
-            return self._chunk_generic(content, metadata)
+            return self._chunk_generic(content, metadata, header)
     
-    def _chunk_javascript(self, content: str, metadata: Dict) -> List[Dict]:
+    def _chunk_javascript(self, content: str, metadata: Dict, header: str = None) -> List[Dict]:
         """Chunk JavaScript/TypeScript code"""
         chunks = []
         
@@ -38,45 +61,88 @@ class SmartCodeChunker(ChunkStrategy):
         
         current_chunk = []
         current_size = 0
+        last_size = 0  # Size of current_chunk[-1], reused for the overlap
         
         for block in blocks:
             block_size = len(block)
             
             if current_size + block_size > self.chunk_size and current_chunk:
-                # Save current chunk
+                # Save current chunk (joined once, when it is finalized)
                 chunk_content = '\n\n'.join(current_chunk)
-                chunks.append(self._create_chunk(chunk_content, metadata, len(chunks)))
+                chunks.append(self._create_chunk(chunk_content, metadata, len(chunks), header))
                 
                 # Start new chunk with overlap
-                if self.overlap > 0 and current_chunk:
+                if self.overlap > 0:
                     current_chunk = [current_chunk[-1], block]
-                    current_size = len(current_chunk[-1]) + block_size
+                    current_size = last_size + block_size
                 else:
                     current_chunk = [block]
                     current_size = block_size
             else:
                 current_chunk.append(block)
                 current_size += block_size
+            
+            last_size = block_size
         
         # Add remaining chunk
         if current_chunk:
             chunk_content = '\n\n'.join(current_chunk)
-            chunks.append(self._create_chunk(chunk_content, metadata, len(chunks)))
+            chunks.append(self._create_chunk(chunk_content, metadata, len(chunks), header))
         
-        return chunks if chunks else [self._create_chunk(content, metadata, 0)]
+        return chunks if chunks else [self._create_chunk(content, metadata, 0, header)]
     
-    def _split_by_constructs(self, content: str) -> List[str]:
-        """Split by functions, classes, exports"""
+    def _split_by_constructs(self, content: str) -> Iterator[str]:
+        """Split by functions, classes, exports
+        
+        Streams blocks in a single pass: declarations are only treated as
+        cut points while the brace depth is zero, so a block never ends
+        inside a function or class body.
+        """
+        start = 0
+        depth = 0
+        emitted = False
         
-        # Split by double newlines first
-        blocks = [b.strip() for b in content.split('\n\n') if b.strip()]
+        for match in _SCAN_RE.finditer(content):
+            kind = match.lastgroup
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth = max(depth - 1, 0)  # Stray closing braces
+            elif kind == 'reset':
+                depth = 0
+            elif kind == 'boundary' and depth == 0:
+                cut = match.start()
+                if cut == start:
+                    continue
+                
+                for block in self._split_oversized(content[start:cut]):
+                    emitted = True
+                    yield block
+                start = cut
         
-        if not blocks:
-            blocks = [content]
+        for block in self._split_oversized(content[start:]):
+            emitted = True
+            yield block
         
-        return blocks
+        if not emitted:
+            yield content
     
-    def _chunk_generic(self, content: str, metadata: Dict) -> List[Dict]:
+    def _split_oversized(self, block: str) -> Iterator[str]:
+        """Fall back to blank-line splitting for blocks larger than a chunk"""
+        block = block.strip()
+        if not block:
+            return
+        
+        if len(block) <= self.chunk_size:
+            yield block
+            return
+        
+        for part in block.split('\n\n'):
+            part = part.strip()
+            if part:
+                yield part
+    
+    def _chunk_generic(self, content: str, metadata: Dict, header: str = None) -> List[Dict]:
         """Generic chunking by lines"""
         lines = content.split('\n')
         chunks = []
@@ -89,7 +155,7 @@ class SmartCodeChunker(ChunkStrategy):
             
             if current_size + line_size > self.chunk_size and current_chunk:
                 chunk_content = '\n'.join(current_chunk)
-                chunks.append(self._create_chunk(chunk_content, metadata, len(chunks)))
+                chunks.append(self._create_chunk(chunk_content, metadata, len(chunks), header))
                 
                 # Overlap
                 overlap_lines = max(1, int(self.overlap / max(1, current_size / len(current_chunk))))
@@ -101,27 +167,32 @@ class SmartCodeChunker(ChunkStrategy):
         
         if current_chunk:
             chunk_content = '\n'.join(current_chunk)
-            chunks.append(self._create_chunk(chunk_content, metadata, len(chunks)))
+            chunks.append(self._create_chunk(chunk_content, metadata, len(chunks), header))
         
-        return chunks if chunks else [self._create_chunk(content, metadata, 0)]
+        return chunks if chunks else [self._create_chunk(content, metadata, 0, header)]
     
-    def _create_chunk(self, content: str, metadata: Dict, index: int) -> Dict:
+    def _chunk_header(self, metadata: Dict) -> str:
+        """Build the per-file context header, up to the chunk number"""
+        return (
+            f"# File: {metadata.get('file_path', 'unknown')}\n"
+            f"# Layer: {metadata.get('layer', 'unknown')}\n"
+            f"# Feature: {metadata.get('feature', 'N/A')}\n"
+            f"# Chunk: "
+        )
+    
+    def _create_chunk(self, content: str, metadata: Dict, index: int, header: str = None) -> Dict:
         """Create chunk with metadata"""
         chunk_metadata = metadata.copy()
         chunk_metadata['chunk_index'] = index
         chunk_metadata['chunk_size'] = len(content)
         
-        # Add context header
-        enhanced_content = f"""# File: {metadata.get('file_path', 'unknown')}
-# Layer: {metadata.get('layer', 'unknown')}
-# Feature: {metadata.get('feature', 'N/A')}
-# Chunk: {index + 1}
-
-{content}
-"""
+        if header is None:
+            header = self._chunk_header(metadata)
+        
+        # Add context header (header never has leading whitespace)
+        enhanced_content = header + str(index + 1) + '\n\n' + content
         
         return {
-            'content': enhanced_content.strip(),
+            'content': enhanced_content.rstrip(),
             'metadata': chunk_metadata
         }
-
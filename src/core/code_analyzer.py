@@ -1,27 +1,63 @@
 """
 Advanced code analysis for React Native projects
 """
+import hashlib
+import json
+import pickle
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
+
+
+# Patterns are compiled once at import and shared by every analyzed file
+_IMPORT_RE = re.compile(r'import\s+.*?from\s+[\'"](.+?)[\'"]')
+_NAMED_EXPORT_RE = re.compile(r'export\s+(?:const|function|class)\s+(\w+)')
+# Function and class components never overlap, so one scan finds both
+_COMPONENT_RE = re.compile(
+    r'(?:export\s+)?(?:const|function)\s+(?P<functional>[A-Z]\w+)\s*=?\s*\([^)]*\)\s*(?:=>)?\s*{'
+    r'|class\s+(?P<class>[A-Z]\w+)\s+extends\s+(?:React\.)?Component'
+)
+_FUNCTION_RE = re.compile(r'(?:const|function)\s+(\w+)\s*=?\s*(?:async\s*)?\([^)]*\)')
 
 
 class ReactNativeAnalyzer:
     """Analyzes React Native code structure and patterns"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, source_root: Optional[Path] = None):
         self.config = config
         self.architecture_config = config.get('architecture', {})
+        # Layers are detected from the path below the scanned source root
+        self.source_root = Path(source_root) if source_root else None
+        
+        # Flatten layer keywords once: keyword -> (priority, layer). Keywords
+        # spanning several path components can't be matched per component
+        # and are checked as substrings instead.
+        self._keyword_to_layer: Dict[str, tuple] = {}
+        self._path_keywords: List[tuple] = []
+        layers = self.architecture_config.get('layers', {})
+        for rank, (layer_name, keywords) in enumerate(layers.items()):
+            for keyword in keywords:
+                if '/' in keyword or '\\' in keyword:
+                    self._path_keywords.append((rank, keyword, layer_name))
+                else:
+                    self._keyword_to_layer.setdefault(keyword, (rank, layer_name))
     
-    def analyze_file(self, file_path: Path, content: str) -> Dict:
-        """Comprehensive file analysis"""
+    def analyze_file(self, file_path: Path, content: str, size_bytes: Optional[int] = None) -> Dict:
+        """Comprehensive file analysis
+        
+        ``size_bytes`` can be passed when already known (e.g. from
+        ``os.stat``) to avoid re-encoding the content just to measure it.
+        """
+        
+        lines_count = content.count('\n') + 1
+        functions = None
         
         metadata = {
             'file_path': str(file_path),
             'file_name': file_path.name,
             'extension': file_path.suffix,
-            'lines_count': len(content.split('\n')),
-            'size_bytes': len(content.encode('utf-8'))
+            'lines_count': lines_count,
+            'size_bytes': size_bytes if size_bytes is not None else len(content.encode('utf-8'))
         }
         
         # Extract various aspects
@@ -35,13 +71,21 @@ class ReactNativeAnalyzer:
             metadata['components'] = self._extract_components(content)
         
         if self.config.get('extract_functions'):
-            metadata['functions'] = self._extract_functions(content)
+            functions = self._extract_functions(content)
+            metadata['functions'] = functions
         
         if self.config.get('detect_patterns'):
             metadata['patterns'] = self._detect_patterns(content)
         
         if self.config.get('calculate_complexity'):
-            metadata['complexity'] = self._calculate_complexity(content)
+            # Reuse counts already gathered above instead of re-scanning
+            if functions is None:
+                functions = self._extract_functions(content)
+            metadata['complexity'] = self._calculate_complexity(
+                lines_count,
+                len(functions),
+                content.count('if ') + content.count('switch ') + content.count('? ')
+            )
         
         if self.architecture_config.get('detect_layers'):
             metadata['layer'] = self._detect_layer(file_path)
@@ -53,17 +97,15 @@ class ReactNativeAnalyzer:
     
     def _extract_imports(self, content: str) -> List[str]:
         """Extract import statements"""
-        import_pattern = r'import\s+.*?from\s+[\'"](.+?)[\'"]'
-        imports = re.findall(import_pattern, content)
-        return list(set(imports))
+        imports = _IMPORT_RE.findall(content)
+        return list(dict.fromkeys(imports))
     
     def _extract_exports(self, content: str) -> List[str]:
         """Extract export statements"""
         exports = []
         
         # Named exports
-        named_pattern = r'export\s+(?:const|function|class)\s+(\w+)'
-        exports.extend(re.findall(named_pattern, content))
+        exports.extend(_NAMED_EXPORT_RE.findall(content))
         
         # Default export
         if 'export default' in content:
@@ -73,31 +115,24 @@ class ReactNativeAnalyzer:
     
     def _extract_components(self, content: str) -> List[Dict]:
         """Extract React components"""
-        components = []
-        
-        # Function components
-        func_pattern = r'(?:export\s+)?(?:const|function)\s+([A-Z]\w+)\s*=?\s*\([^)]*\)\s*(?:=>)?\s*{'
-        for match in re.finditer(func_pattern, content):
-            components.append({
-                'name': match.group(1),
-                'type': 'functional'
-            })
-        
-        # Class components
-        class_pattern = r'class\s+([A-Z]\w+)\s+extends\s+(?:React\.)?Component'
-        for match in re.finditer(class_pattern, content):
-            components.append({
-                'name': match.group(1),
-                'type': 'class'
-            })
+        functional = []
+        classes = []
+        
+        for match in _COMPONENT_RE.finditer(content):
+            if match.lastgroup == 'functional':
+                functional.append({'name': match.group('functional'), 'type': 'functional'})
+            else:
+                classes.append({'name': match.group('class'), 'type': 'class'})
+        
+        # Function components first, then class components
+        components = functional + classes
         
         return components
     
     def _extract_functions(self, content: str) -> List[str]:
         """Extract function names"""
-        func_pattern = r'(?:const|function)\s+(\w+)\s*=?\s*(?:async\s*)?\([^)]*\)'
-        functions = re.findall(func_pattern, content)
-        return list(set(functions))
+        functions = _FUNCTION_RE.findall(content)
+        return list(dict.fromkeys(functions))
     
     def _detect_patterns(self, content: str) -> List[str]:
         """Detect common patterns"""
@@ -118,7 +153,7 @@ class ReactNativeAnalyzer:
         if 'createContext' in content or 'useContext' in content:
             patterns.append('context')
         
-        if re.search(r'test\(|describe\(|it\(', content):
+        if 'test(' in content or 'describe(' in content or 'it(' in content:
             patterns.append('test')
         
         if 'fetch(' in content or 'axios.' in content:
@@ -126,12 +161,8 @@ class ReactNativeAnalyzer:
         
         return patterns
     
-    def _calculate_complexity(self, content: str) -> str:
-        """Calculate code complexity (simplified)"""
-        lines = len(content.split('\n'))
-        functions = len(self._extract_functions(content))
-        conditionals = content.count('if ') + content.count('switch ') + content.count('? ')
-        
+    def _calculate_complexity(self, lines: int, functions: int, conditionals: int) -> str:
+        """Calculate code complexity (simplified) from precomputed counts"""
         score = (lines / 100) + (functions * 2) + (conditionals * 1.5)
         
         if score < 10:
@@ -142,20 +173,31 @@ class ReactNativeAnalyzer:
             return 'high'
     
     def _detect_layer(self, file_path: Path) -> str:
-        """Detect architectural layer"""
-        path_str = str(file_path).lower()
-        
-        layers = self.architecture_config.get('layers', {})
-        
-        for layer_name, keywords in layers.items():
-            if any(keyword in path_str for keyword in keywords):
-                return layer_name
-        
-        return 'unknown'
+        """Detect architectural layer
+        
+        Looks up each path component below ``source_root`` (and the file
+        stem) in the keyword map; when several match, the layer declared
+        first in config wins.
+        """
+        file_path = self._relative_path(file_path)
+        best = None
+        
+        for part in (*file_path.parts[:-1], file_path.stem):
+            hit = self._keyword_to_layer.get(part.lower())
+            if hit and (best is None or hit < best):
+                best = hit
+        
+        if self._path_keywords:
+            path_str = file_path.as_posix().lower()
+            for hit in self._path_keywords:
+                if hit[1] in path_str and (best is None or hit[0] < best[0]):
+                    best = (hit[0], hit[2])
+        
+        return best[1] if best else 'unknown'
     
     def _detect_feature(self, file_path: Path) -> Optional[str]:
-        """Detect feature/domain from path"""
-        parts = file_path.parts
+        """Detect feature/domain from the path below ``source_root``"""
+        parts = self._relative_path(file_path).parts
         
         # Common feature folders
         feature_indicators = ['features', 'modules', 'screens', 'pages']
@@ -165,4 +207,104 @@ class ReactNativeAnalyzer:
                 return parts[i + 1]
         
         return None
+    
+    def _relative_path(self, file_path: Path) -> Path:
+        """Path below ``source_root``, so directories above it never match"""
+        if self.source_root is not None:
+            try:
+                return file_path.relative_to(self.source_root)
+            except ValueError:
+                pass  # Outside the source root, use the whole path
+        return file_path
+
+
 
+class CachedReactNativeAnalyzer(ReactNativeAnalyzer):
+    """
+    Analyzer that reuses results for files whose content has not changed
+    
+    Results are keyed by file path and a hash of the content, and persisted
+    to ``cache_file`` between runs. The whole cache is discarded when the
+    analyzer configuration or ``CACHE_VERSION`` changes.
+    """
+    
+    # Bump when analysis output changes for the same input
+    CACHE_VERSION = 2
+    
+    def __init__(
+        self,
+        config: dict,
+        cache_file: Optional[Path] = None,
+        source_root: Optional[Path] = None
+    ):
+        super().__init__(config, source_root)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.config_hash = hashlib.blake2b(
+            json.dumps(
+                [self.CACHE_VERSION, config], sort_keys=True, default=str
+            ).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        self._cache: Dict = {}
+        self._used: Dict = {}
+        self._load()
+    
+    def analyze_file(self, file_path: Path, content: str, size_bytes: Optional[int] = None) -> Dict:
+        """Analyze file, or return the cached result for identical content"""
+        encoded = content.encode('utf-8', errors='surrogatepass')
+        content_hash = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+        key = (str(file_path), content_hash)
+        
+        metadata = self._cache.get(key)
+        if metadata is None:
+            if size_bytes is None:
+                size_bytes = len(encoded)  # Already encoded for the hash
+            metadata = super().analyze_file(file_path, content, size_bytes)
+            self._cache[key] = metadata
+        
+        self._used[key] = metadata
+        return dict(metadata)
+    
+    def take_entries(self) -> Dict:
+        """Return and clear the entries used since the last call"""
+        entries, self._used = self._used, {}
+        return entries
+    
+    def add_entries(self, entries: Dict) -> None:
+        """Record entries produced by another instance (e.g. a pool worker)"""
+        self._cache.update(entries)
+        self._used.update(entries)
+    
+    def mark_used(self, file_paths: Iterable[Path]) -> None:
+        """Keep the cached entries of files reused without being analyzed"""
+        paths = {str(file_path) for file_path in file_paths}
+        for key, metadata in self._cache.items():
+            if key[0] in paths:
+                self._used[key] = metadata
+    
+    def save(self) -> None:
+        """Persist entries used in this run (stale files are dropped)"""
+        if not self.cache_file:
+            return
+        
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'wb') as f:
+            pickle.dump(
+                {'config_hash': self.config_hash, 'entries': self._used},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+    
+    def _load(self) -> None:
+        """Load a previous cache if it matches the current configuration"""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return  # Corrupt or incompatible cache, rebuild from scratch
+        
+        if data.get('config_hash') == self.config_hash:
+            self._cache = data.get('entries', {})
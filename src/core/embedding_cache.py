@@ -0,0 +1,82 @@
+"""
+Persistent embedding cache keyed by chunk content
+"""
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+import hashlib
+import sqlite3
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed store of embeddings, keyed by SHA-256 of the content
+    
+    Entries are scoped to the embedding model, so switching models never
+    returns vectors from another embedding space. Vectors are stored as
+    float32 blobs.
+    """
+    
+    # Keys per query, below SQLite's bound-parameter limit
+    _QUERY_BATCH = 500
+    
+    def __init__(self, db_path: Path, model: str):
+        self.db_path = Path(db_path)
+        self.model = model
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+    
+    @staticmethod
+    def key(content: str) -> str:
+        """Cache key for a chunk's content"""
+        return hashlib.sha256(content.encode('utf-8', errors='surrogatepass')).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for the keys that are present"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        
+        for start in range(0, len(unique_keys), self._QUERY_BATCH):
+            batch = unique_keys[start:start + self._QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, embedding FROM embeddings "
+                f"WHERE model = ? AND key IN ({placeholders})",
+                [self.model, *batch]
+            )
+            for key, blob in rows:
+                vector = array('f')
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+        
+        return found
+    
+    def put_many(self, entries: Dict[str, Sequence[float]]) -> None:
+        """Store embeddings (existing keys are overwritten)"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, embedding) VALUES (?, ?, ?)",
+                (
+                    (self.model, key, array('f', embedding).tobytes())
+                    for key, embedding in entries.items()
+                )
+            )
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        self.conn.close()
+    
+    def __enter__(self) -> 'EmbeddingCache':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
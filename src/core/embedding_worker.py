@@ -0,0 +1,161 @@
+"""
+Local embedding model hosted in a dedicated subprocess
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+import multiprocessing
+import queue
+import traceback
+
+import numpy as np
+
+
+def _worker_main(
+    model_name: str,
+    cache_folder: Optional[str],
+    batch_size: Optional[int],
+    requests,
+    results
+) -> None:
+    """Subprocess entry point: load the model once, then serve encode jobs"""
+    try:
+        from .local_embeddings import LocalEmbeddings
+        
+        embedder = LocalEmbeddings(
+            model_name=model_name,
+            cache_folder=cache_folder,
+            batch_size=batch_size
+        )
+        results.put(('ready', embedder.get_dimensions()))
+    except BaseException:
+        results.put(('error', traceback.format_exc()))
+        return
+    
+    while True:
+        job = requests.get()
+        if job is None:  # Sentinel
+            return
+        
+        job_id, texts = job
+        try:
+            results.put((job_id, embedder.embed_documents_np(texts)))
+        except BaseException:
+            results.put(('error', traceback.format_exc()))
+            return
+
+
+class EmbeddingWorker:
+    """
+    Run LocalEmbeddings in a subprocess and pipeline batches through it
+    
+    The parent never imports torch: it only builds batches and collects
+    float32 arrays by job id, while the worker keeps the device busy with
+    up to ``max_pending`` queued batches. Provides the subset of the
+    LocalEmbeddings interface the vectorizer uses (``get_dimensions`` and
+    ``embed_documents_stream``).
+    
+    The subprocess is started with the ``spawn`` method, which CUDA needs.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        cache_folder: Optional[str] = None,
+        max_pending: int = 4,
+        batch_size: Optional[int] = None
+    ):
+        self.max_pending = max(1, max_pending)
+        
+        context = multiprocessing.get_context('spawn')
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(model_name, cache_folder, batch_size, self._requests, self._results),
+            name='embedding-worker',
+            daemon=True
+        )
+        self._process.start()
+        
+        self._next_job = 0
+        self._done: Dict[int, np.ndarray] = {}
+        
+        # The worker reports the embedding size once the model is loaded
+        self._dimensions = self._receive('ready')
+    
+    def get_dimensions(self) -> int:
+        """Get the dimension size of embeddings"""
+        return self._dimensions
+    
+    def submit(self, texts: List[str]) -> int:
+        """Queue a batch of texts and return its job id"""
+        job_id = self._next_job
+        self._next_job += 1
+        self._requests.put((job_id, texts))
+        return job_id
+    
+    def result(self, job_id: int) -> np.ndarray:
+        """Wait for the embeddings of a submitted job"""
+        while job_id not in self._done:
+            self._receive()
+        return self._done.pop(job_id)
+    
+    def embed_documents_stream(
+        self,
+        texts: Iterable[str],
+        target_batch: int = 512
+    ) -> Iterator[np.ndarray]:
+        """
+        Embed a stream of texts in large batches, in input order
+        
+        Unlike LocalEmbeddings.embed_documents_stream, the next batches are
+        built and queued while the worker is still encoding earlier ones.
+        """
+        in_flight: List[int] = []
+        pending = []
+        
+        for text in texts:
+            pending.append(text)
+            if len(pending) >= target_batch:
+                in_flight.append(self.submit(pending))
+                pending = []
+                if len(in_flight) >= self.max_pending:
+                    yield self.result(in_flight.pop(0))
+        
+        if pending:
+            in_flight.append(self.submit(pending))
+        
+        for job_id in in_flight:
+            yield self.result(job_id)
+    
+    def close(self) -> None:
+        """Stop the worker process"""
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout=30)
+            if self._process.is_alive():
+                self._process.terminate()
+    
+    def _receive(self, expected: Optional[str] = None):
+        """Read one message from the worker, raising its errors here"""
+        while True:
+            try:
+                key, value = self._results.get(timeout=5)
+                break
+            except queue.Empty:  # Make sure the worker is still running
+                if not self._process.is_alive():
+                    raise RuntimeError(
+                        f"Embedding worker exited unexpectedly (code {self._process.exitcode})"
+                    )
+        
+        if key == 'error':
+            raise RuntimeError(f"Embedding worker failed:\n{value}")
+        if expected is not None:
+            return value
+        
+        self._done[key] = value
+    
+    def __enter__(self) -> 'EmbeddingWorker':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
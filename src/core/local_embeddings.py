@@ -1,12 +1,39 @@
 """
 Local Embeddings - No API key required!
 Uses sentence-transformers for local embedding generation.
+
+torch and sentence-transformers are imported on first use, so importing this
+module (or running with the OpenAI provider) doesn't pay their startup cost.
 """
-from sentence_transformers import SentenceTransformer
-from typing import List
-import torch
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+from functools import lru_cache
+import os
+import numpy as np
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str, cache_folder: Optional[str], device: str) -> "SentenceTransformer":
+    """
+    Load a sentence-transformer model once per process
+
+    The returned model is shared between every LocalEmbeddings built with
+    the same arguments, so callers must not mutate it. Inference through
+    ``encode`` is re-entrant and safe to share.
+
+    On GPU/MPS the weights are converted to FP16, which halves memory
+    traffic with negligible loss in cosine similarity.
+    """
+    from sentence_transformers import SentenceTransformer
+    
+    model = SentenceTransformer(model_name, cache_folder=cache_folder, device=device)
+    if device in ('cuda', 'mps'):
+        model = model.half()
+    return model
+
 
 class LocalEmbeddings:
     """Generate embeddings locally without API calls"""
@@ -36,13 +63,28 @@ class LocalEmbeddings:
         }
     }
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_folder: str = None):
+    # Encode batch size per device (override with embedding.local_batch_size
+    # or the CORTEX_EMB_BATCH environment variable)
+    DEVICE_BATCH_SIZES = {
+        'cuda': 256,
+        'mps': 128,
+        'cpu': 8
+    }
+    
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_folder: str = None,
+        batch_size: Optional[int] = None
+    ):
         """
         Initialize local embedding model
         
         Args:
             model_name: Name of the sentence-transformer model
             cache_folder: Where to cache downloaded models
+            batch_size: Encode batch size (default: CORTEX_EMB_BATCH, then
+                tuned per device)
         """
         self.model_name = model_name
         
@@ -60,51 +102,123 @@ class LocalEmbeddings:
         if cache_folder:
             Path(cache_folder).mkdir(parents=True, exist_ok=True)
         
-        # Load model
-        self.model = SentenceTransformer(
-            model_name,
-            cache_folder=cache_folder
-        )
+        import torch
         
         # Use GPU if available
         self.device = 'cpu'
         if torch.cuda.is_available():
-            self.model = self.model.to('cuda')
             self.device = 'cuda'
             print("   🚀 GPU acceleration enabled")
         elif torch.backends.mps.is_available():
-            self.model = self.model.to('mps')
             self.device = 'mps'
             print("   🚀 Apple Silicon acceleration enabled")
         else:
+            torch.set_num_threads(os.cpu_count() or 1)
             print("   💻 Using CPU (slower but works)")
         
+        env_batch = os.getenv('CORTEX_EMB_BATCH')
+        if batch_size:
+            self.batch_size = batch_size
+        elif env_batch:
+            self.batch_size = int(env_batch)
+        else:
+            self.batch_size = self.DEVICE_BATCH_SIZES[self.device]
+        
+        # Load model (cached per process, see _get_model)
+        self.model = _get_model(model_name, cache_folder, self.device)
+        
         print(f"   ✅ Model loaded successfully!")
         print(f"   📐 Embedding dimensions: {self.get_dimensions()}")
     
+    def embed_documents_np(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as a single array
+        
+        Args:
+            texts: List of text strings to embed
+            
+        Returns:
+            Float32 array of shape (len(texts), dimensions)
+        """
+        if not texts:
+            return np.empty((0, self.get_dimensions()), dtype=np.float32)
+        
+        import torch
+        
+        # Generate embeddings with progress bar
+        with torch.inference_mode():
+            embeddings = self.model.encode(
+                texts,
+                show_progress_bar=len(texts) > 10,  # Show only for large batches
+                batch_size=self.batch_size,
+                convert_to_tensor=True,
+                normalize_embeddings=True  # Normalize for better similarity
+            )
+        
+        # Half-precision models return FP16 tensors; export as FP32
+        return embeddings.float().cpu().numpy()
+    
+    def embed_documents_stream(
+        self,
+        texts: Iterable[str],
+        target_batch: int = 512
+    ) -> Iterator[np.ndarray]:
+        """
+        Embed a stream of texts in large batches
+        
+        Texts are accumulated until ``target_batch`` is reached and encoded
+        in a single call, amortizing per-call overhead across files.
+        
+        Args:
+            texts: Iterable of text strings to embed
+            target_batch: Number of texts per encode call
+            
+        Yields:
+            Float32 arrays of embeddings, in input order
+        """
+        pending = []
+        for text in texts:
+            pending.append(text)
+            if len(pending) >= target_batch:
+                yield self.embed_documents_np(pending)
+                pending = []
+        
+        if pending:
+            yield self.embed_documents_np(pending)
+    
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts
         
+        Compatibility wrapper around embed_documents_np that returns lists.
+        
         Args:
             texts: List of text strings to embed
             
         Returns:
             List of embedding vectors
         """
-        if not texts:
-            return []
+        return self.embed_documents_np(texts).tolist()
+    
+    def embed_query_np(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text as an array
         
-        # Generate embeddings with progress bar
-        embeddings = self.model.encode(
-            texts,
-            show_progress_bar=len(texts) > 10,  # Show only for large batches
-            batch_size=32,
-            convert_to_numpy=True,
-            normalize_embeddings=True  # Normalize for better similarity
-        )
-        
-        return embeddings.tolist()
+        Args:
+            text: Text string to embed
+            
+        Returns:
+            Float32 embedding vector
+        """
+        import torch
+        
+        with torch.inference_mode():
+            embedding = self.model.encode(
+                text,
+                convert_to_tensor=True,
+                normalize_embeddings=True
+            )
+        return embedding.float().cpu().numpy()
     
     def embed_query(self, text: str) -> List[float]:
         """
@@ -116,12 +230,11 @@ class LocalEmbeddings:
         Returns:
             Embedding vector
         """
-        embedding = self.model.encode(
-            text,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
-        return embedding.tolist()
+        return self.embed_query_np(text).tolist()
+    
+    def warmup(self) -> None:
+        """Run a tiny encode so kernel setup does not skew the first real batch"""
+        self.embed_documents_np(["warmup"])
     
     def get_dimensions(self) -> int:
         """Get the dimension size of embeddings"""
@@ -141,18 +254,19 @@ class LocalEmbeddings:
 class LocalEmbeddingsWrapper:
     """Wrapper to make local embeddings compatible with OpenAI interface"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.embeddings = LocalEmbeddings(model_name)
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_folder: str = None):
+        # Goes through the shared model cache in LocalEmbeddings
+        self.embeddings = LocalEmbeddings(model_name, cache_folder=cache_folder)
     
     def create(self, input: List[str], model: str = None):
         """OpenAI-compatible create method"""
-        embeddings = self.embeddings.embed_documents(input)
+        embeddings = self.embeddings.embed_documents_np(input)
         
-        # Return in OpenAI format
+        # Return in OpenAI format (lists are materialized per row)
         class Response:
             def __init__(self, embeddings):
                 self.data = [
-                    type('obj', (object,), {'embedding': emb})
+                    type('obj', (object,), {'embedding': emb.tolist()})
                     for emb in embeddings
                 ]
         
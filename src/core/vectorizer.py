@@ -1,55 +1,134 @@
 """
 Main vectorizer class - Core of CodeArchitect AI
 """
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import time
 import os
 
+from ..utils.file_utils import build_ignore_spec, read_file_safe, scan_code_files
 from ..utils.logger import CortexLogger
-from .code_analyzer import ReactNativeAnalyzer
+from .code_analyzer import ReactNativeAnalyzer, CachedReactNativeAnalyzer
 from .chunk_strategy import SmartCodeChunker
+from .embedding_cache import EmbeddingCache
+
+
+def _build_analyzer(
+    metadata_config: dict,
+    output_dir: str,
+    source_root: Optional[str] = None
+) -> ReactNativeAnalyzer:
+    """Create the analyzer, cached on disk when metadata.cache_analysis is set"""
+    if metadata_config.get('cache_analysis', False):
+        return CachedReactNativeAnalyzer(
+            metadata_config,
+            cache_file=Path(output_dir) / '.analyzer_cache.pkl',
+            source_root=source_root
+        )
+    return ReactNativeAnalyzer(metadata_config, source_root)
+
+
+@lru_cache(maxsize=4)
+def _get_local_embedder(model_name: str, cache_folder: str, batch_size: Optional[int] = None):
+    """Create the local embedder once per process and reuse it
+    
+    Later CodeVectorizer instances (notebooks, tests, long-running servers)
+    skip device detection and model setup. Pool worker processes have their
+    own address space and would still load their own copy.
+    """
+    from .local_embeddings import LocalEmbeddings
+    
+    return LocalEmbeddings(
+        model_name=model_name,
+        cache_folder=cache_folder,
+        batch_size=batch_size
+    )
+
+
+# Per-process state for the analysis pool, built once by _init_worker so
+# regexes and the analyzer cache are loaded once per worker, not per file
+_worker_analyzer: Optional[ReactNativeAnalyzer] = None
+_worker_chunker: Optional[SmartCodeChunker] = None
+
+
+def _init_worker(
+    metadata_config: dict,
+    output_dir: str,
+    source_root: str,
+    chunk_size: int,
+    overlap: int
+):
+    """Initialize analyzer and chunker inside a pool worker"""
+    global _worker_analyzer, _worker_chunker
+    _worker_analyzer = _build_analyzer(metadata_config, output_dir, source_root)
+    _worker_chunker = SmartCodeChunker(chunk_size=chunk_size, overlap=overlap)
+
+
+def _analyze_and_chunk(file_path: Path) -> Tuple[List[Dict], Dict]:
+    """Read, analyze and chunk one file in a pool worker
+    
+    Returns the chunks plus any analyzer cache entries, which the parent
+    merges into its own cache before saving.
+    """
+    size_bytes = file_path.stat().st_size
+    content = read_file_safe(file_path, size_bytes)
+    metadata = _worker_analyzer.analyze_file(file_path, content, size_bytes)
+    chunks = _worker_chunker.chunk(content, metadata)
+    
+    entries = {}
+    if isinstance(_worker_analyzer, CachedReactNativeAnalyzer):
+        entries = _worker_analyzer.take_entries()
+    
+    return chunks, entries
 
 
 class CodeVectorizer:
     """Main vectorization engine"""
     
+    # Local embeddings are length-sorted within windows of this many chunks
+    # when results are streamed to a sink (otherwise across all chunks)
+    SORT_WINDOW = 4096
+    
+    # OpenAI Batch API: per-job limits on embedding inputs (across all
+    # requests) and input file size, and status polling bounds (s)
+    BATCH_API_MAX_INPUTS = 50000
+    BATCH_API_MAX_FILE_BYTES = 200 * 1000 * 1000
+    BATCH_API_POLL_INTERVAL = 10
+    BATCH_API_MAX_POLL_INTERVAL = 300
+    
     def __init__(self, config, logger: Optional[CortexLogger] = None):
         self.config = config
         # Use agent name from config, fallback to "Cortex"
         agent_name = config.project.get('agent_name', 'Cortex')
         self.logger = logger or CortexLogger(agent_name, config.logging)
         
-        # Initialize components
-        self.analyzer = ReactNativeAnalyzer(config.metadata)
+        # Initialize components; layer and feature detection read the
+        # architecture section, which lives next to metadata in the config
+        self._analyzer_config = {**config.metadata, 'architecture': config.architecture}
+        self.analyzer = _build_analyzer(
+            self._analyzer_config,
+            config.paths.output_dir,
+            config.paths.source_code
+        )
         self.chunker = SmartCodeChunker(
             chunk_size=config.code_processing.chunking.chunk_size,
             overlap=config.code_processing.chunking.chunk_overlap
         )
         
-        # Initialize embedding client based on provider
+        # Validate the provider now; the embedder itself is created on first
+        # use (see embedder), so --dry-run never imports torch or openai
         self.embedding_provider = config.embedding.provider
         
         if self.embedding_provider == "local":
-            self.logger.info("🆓 Initializing LOCAL embeddings (no API key needed)")
-            from .local_embeddings import LocalEmbeddings
-            
-            model_name = config.embedding.model
-            cache_folder = config.embedding.cache_folder or './models'
-            
-            self.embedder = LocalEmbeddings(
-                model_name=model_name,
-                cache_folder=cache_folder
-            )
-            
-            model_info = self.embedder.get_model_info()
-            self.logger.info(f"   📐 Dimensions: {model_info['dimensions']}")
-            self.logger.info(f"   ⚡ Speed: {model_info['speed']}")
-            self.logger.info(f"   🎯 Quality: {model_info['quality']}")
+            self.logger.info("🆓 Using LOCAL embeddings (no API key needed)")
             
         elif self.embedding_provider == "openai":
-            self.logger.info("☁️  Initializing OpenAI embeddings")
-            from openai import OpenAI
+            self.logger.info("☁️  Using OpenAI embeddings")
             
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
@@ -58,7 +137,7 @@ class CodeVectorizer:
                     "Please set it in .env file or use provider: local"
                 )
             
-            self.embedder = OpenAI(api_key=api_key)
+            self._openai_api_key = api_key
             self.logger.info(f"   🤖 Model: {config.embedding.model}")
             
         else:
@@ -74,10 +153,53 @@ class CodeVectorizer:
             'embedding_provider': self.embedding_provider
         }
     
-    def process_codebase(self, source_path: Optional[str] = None) -> List[Dict]:
-        """Process entire codebase"""
+    @cached_property
+    def embedder(self):
+        """Embedding backend for the configured provider, created on first use"""
+        if self.embedding_provider == "local":
+            return self._load_local_embedder()
+        return self._get_openai_client()
+    
+    def _load_local_embedder(self):
+        """Load (or reuse) the local sentence-transformer embedder"""
+        self.logger.info("🆓 Initializing LOCAL embeddings")
+        
+        model_name = self.config.embedding.model
+        cache_folder = self.config.embedding.cache_folder or './models'
+        
+        embedder = _get_local_embedder(
+            model_name, cache_folder, self.config.embedding.local_batch_size
+        )
+        
+        model_info = embedder.get_model_info()
+        self.logger.info(f"   📐 Dimensions: {model_info['dimensions']}")
+        self.logger.info(f"   ⚡ Speed: {model_info['speed']}")
+        self.logger.info(f"   🎯 Quality: {model_info['quality']}")
+        
+        return embedder
+    
+    def _get_openai_client(self):
+        """Create the synchronous OpenAI client (Batch API and file uploads)"""
+        from openai import OpenAI
+        
+        return OpenAI(api_key=self._openai_api_key)
+    
+    def process_codebase(
+        self,
+        source_path: Optional[str] = None,
+        prior_files: Optional[Dict[str, Dict]] = None
+    ) -> List[Dict]:
+        """Process entire codebase
+        
+        With ``export.incremental``, each file's mtime and the hash of the
+        chunking/analysis settings are recorded in its chunk metadata, and
+        files in ``prior_files`` (from ``VectorExporter.load_prior``) whose
+        mtime, size and settings are unchanged reuse their previous chunks
+        without being read again.
+        """
         source_path = source_path or self.config.paths.source_code
         root = Path(source_path)
+        self.analyzer.source_root = root
         
         self.logger.info(f"🚀 Starting codebase analysis: {root}")
         self.logger.info(f"🤖 Agent: {self.config.project['agent_name']}")
@@ -89,21 +211,87 @@ class CodeVectorizer:
         files = self._scan_files(root)
         self.logger.info(f"📁 Found {len(files)} files to process")
         
-        # Process each file
-        for file_path in files:
-            try:
-                chunks = self._process_file(file_path)
-                all_chunks.extend(chunks)
-                self.stats['files_processed'] += 1
-                
-                if self.stats['files_processed'] % 10 == 0:
-                    self.logger.processing(
-                        f"Processed {self.stats['files_processed']}/{len(files)} files"
-                    )
+        # Results are collected by index so chunks keep scan order
+        results: List[Optional[List[Dict]]] = [None] * len(files)
+        pending = list(range(len(files)))
+        
+        incremental = self.config.export.get('incremental', False)
+        mtimes: Dict[int, int] = {}
+        if incremental:
+            config_hash = self._processing_config_hash()
+            pending = self._skip_unchanged_files(
+                files, prior_files or {}, results, mtimes, config_hash
+            )
             
-            except Exception as e:
-                self.stats['errors'] += 1
-                self.logger.error(f"Error processing {file_path}: {str(e)}")
+            # Reused files skip analysis; keep their analyzer cache entries
+            if isinstance(self.analyzer, CachedReactNativeAnalyzer):
+                self.analyzer.mark_used(
+                    file_path for file_path, chunks in zip(files, results)
+                    if chunks is not None
+                )
+        
+        # Analysis and chunking are CPU-bound: use processes when configured,
+        # otherwise threads, which still overlap file reads
+        cpu_workers = self.config.code_processing.cpu_workers
+        if cpu_workers < 0:
+            cpu_workers = os.cpu_count() or 1
+        if cpu_workers > 0:
+            self.logger.info(f"⚙️  Using {cpu_workers} worker processes")
+            executor = ProcessPoolExecutor(
+                max_workers=cpu_workers,
+                initializer=_init_worker,
+                initargs=(
+                    self._analyzer_config,
+                    self.config.paths.output_dir,
+                    str(root),
+                    self.chunker.chunk_size,
+                    self.chunker.overlap
+                )
+            )
+            process = _analyze_and_chunk
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, self.config.code_processing.io_workers)
+            )
+            process = self._process_file_job
+        
+        with executor:
+            futures = {
+                executor.submit(process, files[idx]): idx
+                for idx in pending
+            }
+            
+            # Stats are only touched here, in the calling thread
+            for future in as_completed(futures):
+                file_path = files[futures[future]]
+                try:
+                    chunks, entries = future.result()
+                    if entries:
+                        self.analyzer.add_entries(entries)
+                    
+                    if incremental:
+                        for chunk in chunks:
+                            chunk['metadata']['mtime_ns'] = mtimes.get(futures[future])
+                            chunk['metadata']['config_hash'] = config_hash
+                    
+                    results[futures[future]] = chunks
+                    self.stats['files_processed'] += 1
+                    
+                    if self.stats['files_processed'] % 10 == 0:
+                        self.logger.processing(
+                            "Processed %d/%d files", self.stats['files_processed'], len(pending)
+                        )
+                
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    self.logger.error(f"Error processing {file_path}: {str(e)}")
+        
+        for chunks in results:
+            if chunks:
+                all_chunks.extend(chunks)
+        
+        if isinstance(self.analyzer, CachedReactNativeAnalyzer):
+            self.analyzer.save()
         
         elapsed = time.time() - start_time
         self.stats['chunks_created'] = len(all_chunks)
@@ -115,133 +303,594 @@ class CodeVectorizer:
         
         return all_chunks
     
-    def _scan_files(self, root: Path) -> List[Path]:
-        """Scan for relevant files"""
-        files = []
-        extensions = set(self.config.code_processing.extensions)
-        ignore_dirs = set(self.config.code_processing.ignore_dirs)
-        ignore_files = set(self.config.code_processing.ignore_files)
-        
-        for file_path in root.rglob('*'):
-            # Skip ignored directories
-            if any(ignored in file_path.parts for ignored in ignore_dirs):
-                continue
-            
-            # Skip ignored files
-            if file_path.name in ignore_files:
+    def _skip_unchanged_files(
+        self,
+        files: List[Path],
+        prior_files: Dict[str, Dict],
+        results: List[Optional[List[Dict]]],
+        mtimes: Dict[int, int],
+        config_hash: str
+    ) -> List[int]:
+        """Fill ``results`` for files unchanged since the prior export
+        
+        Files processed with other settings (``config_hash``) are never
+        reused. Records each file's mtime in ``mtimes`` and returns the
+        indices of files that still need processing.
+        """
+        pending = []
+        
+        for idx, file_path in enumerate(files):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                pending.append(idx)  # Reported when processing fails
                 continue
             
-            # Check extension
-            if file_path.is_file() and file_path.suffix in extensions:
-                files.append(file_path)
+            mtimes[idx] = stat.st_mtime_ns
+            previous = prior_files.get(str(file_path))
+            if (
+                previous
+                and previous['config_hash'] == config_hash
+                and previous['mtime_ns'] == stat.st_mtime_ns
+                and previous['size_bytes'] == stat.st_size
+            ):
+                results[idx] = previous['chunks']
+            else:
+                pending.append(idx)
+        
+        self.stats['files_unchanged'] = len(files) - len(pending)
+        self.logger.info(f"   ♻️  {self.stats['files_unchanged']} files unchanged since the last export")
+        
+        return pending
+    
+    def _processing_config_hash(self) -> str:
+        """Hash of every setting that shapes chunks and their metadata"""
+        return hashlib.blake2b(
+            json.dumps(
+                [
+                    CachedReactNativeAnalyzer.CACHE_VERSION,
+                    self.chunker.chunk_size,
+                    self.chunker.overlap,
+                    self._analyzer_config
+                ],
+                sort_keys=True,
+                default=str
+            ).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+    
+    def _scan_files(self, root: Path) -> List[Path]:
+        """Scan for relevant files"""
+        return scan_code_files(
+            root,
+            self.config.code_processing.extensions,
+            self.config.code_processing.ignore_dirs,
+            self.config.code_processing.ignore_files,
+            max_workers=self.config.code_processing.io_workers,
+            ignore_spec=self._build_ignore_spec(root)
+        )
+    
+    def _build_ignore_spec(self, root: Path):
+        """Compile ignore_patterns and the source .gitignore, once per scan"""
+        patterns = self.config.code_processing.ignore_patterns
+        gitignore_file = root / '.gitignore' if self.config.code_processing.use_gitignore else None
         
-        return sorted(files)
+        try:
+            return build_ignore_spec(patterns, gitignore_file)
+        except ImportError:
+            if patterns:
+                raise ImportError(
+                    "code_processing.ignore_patterns requires pathspec: pip install pathspec"
+                )
+            self.logger.warning("⚠️  pathspec not installed, .gitignore is not applied")
+            return None
+    
+    def _process_file_job(self, file_path: Path) -> Tuple[List[Dict], Dict]:
+        """Thread-pool job, same result shape as the process-pool worker"""
+        return self._process_file(file_path), {}
     
     def _process_file(self, file_path: Path) -> List[Dict]:
         """Process a single file"""
-        self.logger.debug(f"Processing: {file_path}")
+        self.logger.debug("Processing: %s", file_path)
         
-        # Read content
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
+        # Read content (UTF-8 with latin-1 fallback, large files via mmap)
+        size_bytes = file_path.stat().st_size
+        content = read_file_safe(file_path, size_bytes)
         
-        # Analyze file
-        metadata = self.analyzer.analyze_file(file_path, content)
+        # Analyze file (size from stat, no need to re-encode the content)
+        metadata = self.analyzer.analyze_file(file_path, content, size_bytes)
         
         # Chunk content
         chunks = self.chunker.chunk(content, metadata)
         
         return chunks
     
-    def generate_embeddings(self, chunks: List[Dict]) -> List[Dict]:
-        """Generate embeddings for all chunks"""
+    def generate_embeddings(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None,
+        prior: Optional[Dict[str, List[float]]] = None
+    ) -> Optional[List[Dict]]:
+        """Generate embeddings for all chunks
+        
+        When ``sink`` is given, it is called with each batch of enriched
+        chunks as soon as the batch is embedded, in input order, so the
+        caller can write results while later batches are still running.
+        Enriched chunks are then not kept, and None is returned.
+        
+        ``prior`` maps ``EmbeddingCache.key(content)`` to embeddings from a
+        previous export (see ``VectorExporter.load_prior``); chunks found
+        there are not embedded again.
+        """
         self.logger.info(f"🧠 Generating embeddings for {len(chunks)} chunks")
         self.logger.info(f"   📡 Provider: {self.embedding_provider}")
         
-        batch_size = self.config.embedding.batch_size
-        enriched_chunks = []
+        if self.config.embedding.cache_embeddings:
+            cache_file = Path(self.config.paths.output_dir) / '.embedding_cache.sqlite'
+            with EmbeddingCache(cache_file, self.config.embedding.model) as cache:
+                enriched_chunks = self._generate_embeddings_reusing(chunks, prior, sink, cache)
+        else:
+            enriched_chunks = self._generate_embeddings_reusing(chunks, prior, sink)
+        
+        self.logger.success(f"Generated {len(chunks)} embeddings")
+        return enriched_chunks
+    
+    def _generate_embeddings_reusing(
+        self,
+        chunks: List[Dict],
+        prior: Optional[Dict[str, List[float]]] = None,
+        sink: Optional[Callable[[List[Dict]], None]] = None,
+        cache: Optional[EmbeddingCache] = None
+    ) -> Optional[List[Dict]]:
+        """Embed each distinct unknown content once, merging results in order
         
-        total_batches = (len(chunks) + batch_size - 1) // batch_size
+        Known embeddings come from ``cache`` first, then from ``prior``;
+        fresh ones are added to ``cache``. Chunks with identical content
+        (license headers, boilerplate, re-export stubs) share one embedding.
+        """
+        keys = [EmbeddingCache.key(chunk['content']) for chunk in chunks]
+        
+        cached = {}
+        if cache is not None:
+            cached = cache.get_many(keys)
+        if prior:
+            cached.update(
+                (key, prior[key]) for key in keys if key in prior and key not in cached
+            )
+        
+        # First chunk of each distinct content that still needs embedding
+        unique_missing: Dict[str, Dict] = {}
+        for chunk, key in zip(chunks, keys):
+            if key not in cached and key not in unique_missing:
+                unique_missing[key] = chunk
+        missing_keys = list(unique_missing)
+        
+        reused = sum(key in cached for key in keys)
+        if reused or len(missing_keys) < len(chunks) - reused:
+            self.logger.info(
+                f"   ♻️  Reusing {reused} known embeddings, "
+                f"{len(missing_keys)} unique chunks to generate"
+            )
         
-        for batch_idx in range(0, len(chunks), batch_size):
-            batch = chunks[batch_idx:batch_idx + batch_size]
-            texts = [chunk['content'] for chunk in batch]
+        # With a sink, enriched chunks are handed over and not kept
+        enriched_chunks = None if sink else []
+        new_entries = {}
+        emitted = 0
+        
+        def merge(batch: List[Dict] = ()) -> None:
+            nonlocal emitted
             
-            current_batch = (batch_idx // batch_size) + 1
+            # Fresh results arrive in missing_keys order
+            for enriched in batch:
+                new_entries[missing_keys[len(new_entries)]] = enriched['embedding']
             
-            try:
-                if self.embedding_provider == "local":
-                    # Local embeddings
-                    self.logger.debug(f"Processing batch {current_batch}/{total_batches}...")
-                    embeddings = self.embedder.embed_documents(texts)
-                    
-                    for chunk, embedding in zip(batch, embeddings):
-                        enriched_chunks.append({
-                            **chunk,
-                            'embedding': embedding
-                        })
-                    
-                elif self.embedding_provider == "openai":
-                    # OpenAI API
-                    self.logger.debug(f"Calling OpenAI API - batch {current_batch}/{total_batches}...")
-                    response = self.embedder.embeddings.create(
-                        model=self.config.embedding.model,
-                        input=texts
+            # Emit chunks in input order up to the first one still being embedded
+            ready = []
+            while emitted < len(chunks):
+                key = keys[emitted]
+                embedding = cached.get(key)
+                if embedding is None:
+                    embedding = new_entries.get(key)
+                if embedding is None:
+                    break
+                ready.append({**chunks[emitted], 'embedding': embedding})
+                emitted += 1
+            
+            if not ready:
+                return
+            if sink:
+                sink(ready)
+            else:
+                enriched_chunks.extend(ready)
+        
+        if unique_missing:
+            # Merge per batch only when streaming; otherwise providers may
+            # reorder freely (e.g. length-sorting across all chunks)
+            fresh = self._embed_with_provider(
+                list(unique_missing.values()), merge if sink else None
+            )
+            if not sink:
+                merge(fresh)
+        merge()
+        
+        if cache is not None:
+            cache.put_many(new_entries)
+        return enriched_chunks
+    
+    def _embed_with_provider(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Optional[List[Dict]]:
+        """Embed chunks with the configured provider (None with a sink)"""
+        if self.embedding_provider == "local":
+            if self.config.embedding.worker_process:
+                return self._generate_embeddings_worker(chunks, sink)
+            return self._generate_embeddings_local(chunks, sink)
+        if self.config.embedding.batch_api:
+            return self.generate_embeddings_batch_api(chunks, sink)
+        return self._generate_embeddings_openai(chunks, sink)
+    
+    def _generate_embeddings_worker(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Optional[List[Dict]]:
+        """Embed all chunks with the local model hosted in a subprocess
+        
+        Batches are queued ahead so the device never waits on this process;
+        torch is only imported by the worker.
+        """
+        from .embedding_worker import EmbeddingWorker
+        
+        self.logger.info("🆓 Starting local embedding worker process")
+        with EmbeddingWorker(
+            self.config.embedding.model,
+            self.config.embedding.cache_folder or './models',
+            batch_size=self.config.embedding.local_batch_size
+        ) as worker:
+            return self._generate_embeddings_local(chunks, sink, worker)
+    
+    def _generate_embeddings_local(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None,
+        embedder=None
+    ) -> Optional[List[Dict]]:
+        """Embed all chunks with the local model
+        
+        Texts from every file are streamed to the model in large batches;
+        the model splits them into device-sized mini-batches internally.
+        
+        Chunks are embedded shortest first ("smart batching"), so each
+        mini-batch holds texts of similar length and little compute goes
+        to padding. Rows are written back at the chunks' original positions.
+        
+        ``embedder`` defaults to the in-process model (see ``embedder``).
+        With a sink, each window is handed over and not kept (returns None).
+        """
+        import numpy as np
+        
+        embedder = embedder or self.embedder
+        dimensions = embedder.get_dimensions()
+        
+        # A sink needs results in order, so sort within windows it can flush
+        window = self.SORT_WINDOW if sink else max(len(chunks), 1)
+        enriched_chunks = None if sink else []
+        offset = 0
+        
+        try:
+            for start in range(0, len(chunks), window):
+                window_chunks = chunks[start:start + window]
+                
+                # One contiguous buffer per window (the whole run without a
+                # sink); each chunk gets a row view into it
+                embedding_matrix = np.empty((len(window_chunks), dimensions), dtype=np.float32)
+                
+                order = sorted(
+                    range(len(window_chunks)),
+                    key=lambda i: len(window_chunks[i]['content'])
+                )
+                texts = (window_chunks[i]['content'] for i in order)
+                
+                done = 0
+                for embeddings in embedder.embed_documents_stream(texts):
+                    # Inverse permutation: row k of this batch belongs to chunk order[k]
+                    rows = np.asarray(order[done:done + len(embeddings)])
+                    embedding_matrix[rows] = embeddings
+                    done += len(embeddings)
+                    offset += len(embeddings)
+                    self.logger.processing("Embeddings: %d/%d chunks complete", offset, len(chunks))
+                
+                # Rows stay numpy arrays until the exporter writes them
+                batch = [
+                    {**chunk, 'embedding': embedding}
+                    for chunk, embedding in zip(window_chunks, embedding_matrix)
+                ]
+                if sink:
+                    sink(batch)
+                else:
+                    enriched_chunks.extend(batch)
+        except Exception as e:
+            # Local failures are not transient, fail immediately (no retry)
+            self.logger.error(
+                f"Error generating embeddings at chunk {offset}: {str(e)}",
+                exc_info=True
+            )
+            raise
+        
+        return enriched_chunks
+    
+    def _generate_embeddings_openai(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Optional[List[Dict]]:
+        """Embed all chunks through the OpenAI API in configured batches"""
+        return asyncio.run(self._generate_embeddings_openai_async(chunks, sink))
+    
+    async def _generate_embeddings_openai_async(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Optional[List[Dict]]:
+        """Send all batches concurrently, bounded by embedding.max_concurrency
+        
+        Batches may finish out of order; ``sink`` still receives them in
+        order, each one as soon as every earlier batch is done. The sink
+        runs in a worker thread, so a blocking sink (e.g. a full
+        JsonlStreamWriter queue) never stalls the requests in flight.
+        Emitted batches are released, and None is returned.
+        """
+        from openai import AsyncOpenAI
+        
+        batch_size = self.config.embedding.batch_size
+        batches = [
+            chunks[batch_idx:batch_idx + batch_size]
+            for batch_idx in range(0, len(chunks), batch_size)
+        ]
+        total_batches = len(batches)
+        
+        semaphore = asyncio.Semaphore(max(1, self.config.embedding.max_concurrency))
+        completed = 0
+        enriched_batches: List[Optional[List[Dict]]] = [None] * total_batches
+        next_to_emit = 0
+        emit_lock = asyncio.Lock()  # Keeps sink calls in order across awaits
+        loop = asyncio.get_running_loop()
+        
+        # One async client per run: it is bound to the event loop asyncio.run creates
+        async with AsyncOpenAI(api_key=self._openai_api_key) as client:
+            
+            async def embed_batch(current_batch: int, batch: List[Dict]) -> None:
+                nonlocal completed, next_to_emit
+                async with semaphore:
+                    self.logger.debug("Calling OpenAI API - batch %d/%d...", current_batch, total_batches)
+                    embeddings = await self._create_embeddings_with_retry(
+                        client, current_batch, [chunk['content'] for chunk in batch]
                     )
-                    
-                    for chunk, embedding_data in zip(batch, response.data):
-                        enriched_chunks.append({
-                            **chunk,
-                            'embedding': embedding_data.embedding
-                        })
+                
+                enriched_batches[current_batch - 1] = [
+                    {**chunk, 'embedding': embedding}
+                    for chunk, embedding in zip(batch, embeddings)
+                ]
+                
+                # Hand over every batch that is now complete in input order
+                async with emit_lock:
+                    while next_to_emit < total_batches and enriched_batches[next_to_emit] is not None:
+                        if sink:
+                            await loop.run_in_executor(None, sink, enriched_batches[next_to_emit])
+                            enriched_batches[next_to_emit] = None  # Handed over
+                        next_to_emit += 1
                 
                 # Progress update every 10 batches
-                if current_batch % 10 == 0:
+                completed += 1
+                if completed % 10 == 0:
                     self.logger.processing(
-                        f"Embeddings: {current_batch}/{total_batches} batches complete"
+                        "Embeddings: %d/%d batches complete", completed, total_batches
                     )
             
-            except Exception as e:
-                self.logger.error(
-                    f"Error generating embeddings for batch {current_batch}: {str(e)}", 
-                    exc_info=True
+            results = await asyncio.gather(
+                *(embed_batch(number, batch) for number, batch in enumerate(batches, 1)),
+                return_exceptions=True
+            )
+        
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        
+        if sink:
+            return None
+        return [chunk for batch in enriched_batches for chunk in batch]
+    
+    async def _create_embeddings_with_retry(
+        self,
+        client,
+        current_batch: int,
+        texts: List[str]
+    ) -> List[List[float]]:
+        """Call the embeddings endpoint, retrying this batch with exponential backoff"""
+        max_retries = self.config.embedding.max_retries
+        
+        for retry in range(max_retries + 1):
+            try:
+                response = await client.embeddings.create(
+                    model=self.config.embedding.model,
+                    input=texts
                 )
-                
-                # For local, fail immediately (no retry)
-                if self.embedding_provider == "local":
+                return [embedding_data.embedding for embedding_data in response.data]
+            
+            except Exception as e:
+                if retry == 0:
+                    self.logger.error(
+                        f"Error generating embeddings for batch {current_batch}: {str(e)}",
+                        exc_info=True
+                    )
+                if retry == max_retries:
+                    self.logger.error(f"Failed after {retry} retries")
                     raise
                 
-                # For OpenAI, retry with exponential backoff
-                import time
-                for retry in range(self.config.embedding.max_retries):
-                    try:
-                        self.logger.warning(f"Retrying batch {current_batch} (attempt {retry + 1})...")
-                        time.sleep(2 ** retry)  # Exponential backoff
-                        
-                        response = self.embedder.embeddings.create(
-                            model=self.config.embedding.model,
-                            input=texts
-                        )
-                        
-                        for chunk, embedding_data in zip(batch, response.data):
-                            enriched_chunks.append({
-                                **chunk,
-                                'embedding': embedding_data.embedding
-                            })
-                        break
-                    except Exception as retry_e:
-                        if retry == self.config.embedding.max_retries - 1:
-                            self.logger.error(f"Failed after {retry + 1} retries")
-                            raise retry_e
-        
-        self.logger.success(f"Generated {len(enriched_chunks)} embeddings")
+                self.logger.warning(f"Retrying batch {current_batch} (attempt {retry + 1})...")
+                await asyncio.sleep(2 ** retry)  # Exponential backoff
+    
+    def generate_embeddings_batch_api(
+        self,
+        chunks: List[Dict],
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Optional[List[Dict]]:
+        """Embed chunks through the OpenAI Batch API
+        
+        Requests (``embedding.batch_size`` inputs each) are written to a
+        JSONL file, uploaded and run as batch jobs, which cost half the
+        interactive price and have separate, higher rate limits. Results
+        arrive within the 24h completion window, so this blocks while
+        polling; it is meant for bulk (re-)indexing.
+        
+        With a sink, the chunks of each job are handed over (in order) once
+        it is collected and not kept, and None is returned.
+        """
+        # Jobs run server-side in parallel; collect them in submission order
+        batch_ids = self._submit_embedding_batches(chunks)
+        
+        embeddings: List[Optional[List[float]]] = [None] * len(chunks)
+        enriched_chunks = None if sink else []
+        emitted = 0
+        
+        for batch_id in batch_ids:
+            for offset, embedding in self._collect_embedding_batch(batch_id):
+                embeddings[offset] = embedding
+            
+            # Jobs cover consecutive chunks, so everything up to here is done
+            ready = []
+            while emitted < len(chunks) and embeddings[emitted] is not None:
+                ready.append({**chunks[emitted], 'embedding': embeddings[emitted]})
+                embeddings[emitted] = None
+                emitted += 1
+            
+            if not ready:
+                continue
+            if sink:
+                sink(ready)
+            else:
+                enriched_chunks.extend(ready)
+        
+        if emitted < len(chunks):
+            missing = sum(embedding is None for embedding in embeddings[emitted:])
+            raise RuntimeError(f"Batch API returned no embedding for {missing} chunks")
+        
         return enriched_chunks
     
+    def _submit_embedding_batches(self, chunks: List[Dict]) -> List[str]:
+        """Write embedding requests to JSONL files and start one job per file
+        
+        Each request's ``custom_id`` is the index of its first chunk in
+        ``chunks``. A new job is started before a file would exceed
+        BATCH_API_MAX_INPUTS inputs or BATCH_API_MAX_FILE_BYTES bytes.
+        Returns the batch ids.
+        """
+        batch_size = self.config.embedding.batch_size
+        requests_file = Path(self.config.paths.output_dir) / '.batch_api_requests.jsonl'
+        requests_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        batch_ids = []
+        f = None
+        inputs = 0
+        size = 0
+        
+        try:
+            for batch_idx in range(0, len(chunks), batch_size):
+                batch = chunks[batch_idx:batch_idx + batch_size]
+                line = (json.dumps({
+                    'custom_id': str(batch_idx),
+                    'method': 'POST',
+                    'url': '/v1/embeddings',
+                    'body': {
+                        'model': self.config.embedding.model,
+                        'input': [chunk['content'] for chunk in batch]
+                    }
+                }, ensure_ascii=False) + '\n').encode('utf-8')
+                
+                if f is not None and (
+                    inputs + len(batch) > self.BATCH_API_MAX_INPUTS
+                    or size + len(line) > self.BATCH_API_MAX_FILE_BYTES
+                ):
+                    f.close()
+                    f = None
+                    batch_ids.append(self._start_embedding_batch(requests_file, inputs))
+                
+                if f is None:
+                    f = open(requests_file, 'wb')
+                    inputs = 0
+                    size = 0
+                
+                f.write(line)
+                inputs += len(batch)
+                size += len(line)
+            
+            if f is not None:
+                f.close()
+                f = None
+                batch_ids.append(self._start_embedding_batch(requests_file, inputs))
+        finally:
+            if f is not None:
+                f.close()
+            if requests_file.exists():
+                requests_file.unlink()
+        
+        return batch_ids
+    
+    def _start_embedding_batch(self, requests_file: Path, inputs: int) -> str:
+        """Upload a JSONL of embedding requests and start a batch job"""
+        with open(requests_file, 'rb') as f:
+            input_file = self.embedder.files.create(file=f, purpose='batch')
+        
+        batch = self.embedder.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/embeddings',
+            completion_window='24h'
+        )
+        self.logger.info(f"   📤 Submitted batch {batch.id} ({inputs} chunks)")
+        return batch.id
+    
+    def _collect_embedding_batch(self, batch_id: str) -> Iterator[Tuple[int, List[float]]]:
+        """Wait for a batch job to finish and yield (chunk index, embedding)"""
+        interval = self.BATCH_API_POLL_INTERVAL
+        
+        while True:
+            batch = self.embedder.batches.retrieve(batch_id)
+            if batch.status in ('completed', 'failed', 'expired', 'cancelled'):
+                break
+            
+            counts = batch.request_counts
+            if counts:
+                self.logger.processing(
+                    "Batch %s %s: %d/%d requests complete",
+                    batch_id, batch.status, counts.completed, counts.total
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, self.BATCH_API_MAX_POLL_INTERVAL)
+        
+        if batch.status != 'completed' or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+        
+        failed = 0
+        output = self.embedder.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if result.get('error') or response.get('status_code') != 200:
+                failed += 1
+                continue
+            
+            start = int(result['custom_id'])
+            for item in response['body']['data']:
+                yield start + item['index'], item['embedding']
+        
+        if failed:
+            self.logger.error(f"Batch {batch_id}: {failed} requests failed")
+    
     def get_stats(self) -> Dict:
         """Get processing statistics"""
         return self.stats
@@ -2,12 +2,155 @@
 Export vectorized data to various formats
 """
 import json
+import queue
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
 
+from ..core.embedding_cache import EmbeddingCache
 from ..utils.logger import CortexLogger
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, falls back to the stdlib encoder
+    orjson = None
+
+
+def _json_default(obj):
+    """Serialize numpy embeddings, which are kept as arrays until export"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj, pretty: bool = False) -> bytes:
+    """Encode one object as UTF-8 JSON, with orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option)
+    
+    return json.dumps(
+        obj,
+        indent=2 if pretty else None,
+        separators=None if pretty else (',', ':'),
+        ensure_ascii=False,
+        default=_json_default
+    ).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Decode JSON, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _quantize_int8(vectors):
+    """Scalar-quantize unit-normalized vectors to int8 (scale 1/127)"""
+    import numpy as np
+    
+    return np.clip(np.round(vectors * 127), -127, 127).astype(np.int8)
+
+
+def _fp16_json_row(vector):
+    """Float16 row as float64 values with the shortest decimal that round-trips
+    
+    JSON has no half type and the exact float16 values need more digits than
+    float32, so each value is written as its shortest float16 repr instead.
+    """
+    import numpy as np
+    
+    return vector.astype(str).astype(np.float64)
+
+
+def _jsonl_line(chunk: Dict, embedding_model: Optional[str] = None) -> bytes:
+    """Encode one JSON Lines record
+    
+    Embedded chunks record ``embedding_model`` in their metadata, so an
+    incremental run can tell which model produced each line.
+    """
+    if embedding_model and 'embedding' in chunk:
+        chunk = {**chunk, 'metadata': {**chunk['metadata'], 'embedding_model': embedding_model}}
+    return _dumps(chunk) + b'\n'
+
+
+@dataclass
+class PriorExport:
+    """What a previous export offers to an incremental run"""
+    # Embeddings keyed by EmbeddingCache.key(content)
+    embeddings: Dict[str, List[float]] = field(default_factory=dict)
+    # file_path -> {'mtime_ns', 'size_bytes', 'config_hash', 'chunks'} for
+    # files whose chunks were exported with their modification time
+    files: Dict[str, Dict] = field(default_factory=dict)
+
+
+class JsonlStreamWriter:
+    """
+    Write batches of chunks to a JSON Lines file from a background thread
+    
+    ``submit`` only enqueues, so the producer (embedding generation) keeps
+    running while lines are encoded and written. The queue is bounded so a
+    slow disk applies backpressure instead of buffering the whole corpus.
+    """
+    
+    def __init__(
+        self,
+        output_file: Path,
+        flush_every: int = 1000,
+        max_pending: int = 16,
+        embedding_model: Optional[str] = None
+    ):
+        self.output_file = Path(output_file)
+        self.flush_every = flush_every
+        self.embedding_model = embedding_model
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='jsonl-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, chunks: List[Dict]) -> None:
+        """Queue a batch of chunks to be written"""
+        if self._error is not None:
+            raise self._error
+        self._queue.put(chunks)
+    
+    def close(self) -> None:
+        """Write everything queued so far, then stop the writer thread"""
+        self._queue.put(None)  # Sentinel
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+    
+    def _run(self) -> None:
+        try:
+            with open(self.output_file, 'wb') as f:
+                unflushed = 0
+                while True:
+                    chunks = self._queue.get()
+                    if chunks is None:
+                        return
+                    
+                    for chunk in chunks:
+                        f.write(_jsonl_line(chunk, self.embedding_model))
+                    self.written += len(chunks)
+                    unflushed += len(chunks)
+                    
+                    if unflushed >= self.flush_every:
+                        f.flush()
+                        unflushed = 0
+        except BaseException as e:
+            self._error = e
+            # Keep draining so a blocked producer can reach close()
+            while self._queue.get() is not None:
+                pass
+
 
 class VectorExporter:
     """Export vectorized codebase"""
@@ -27,6 +170,83 @@ class VectorExporter:
         else:
             raise ValueError(f"Unsupported format: {export_config['format']}")
     
+    def load_prior(self, path: Optional[str] = None) -> PriorExport:
+        """Load a previous export for an incremental run
+        
+        ``path`` defaults to the configured output of the current format.
+        Embeddings made with a different embedding model, or whose model
+        isn't recorded, are ignored, and so are fp16/int8 exports: reusing
+        lossy vectors would carry the loss into every later export.
+        """
+        prior = PriorExport()
+        
+        if path is None:
+            path = self.config.paths.export_file
+            if self.config.export['format'] == 'jsonl':
+                path = self._jsonl_output_file()
+        path = Path(path)
+        
+        if not path.exists():
+            return prior
+        
+        reuse_embeddings = False
+        vectors = None
+        jsonl = path.suffix == '.jsonl'
+        if jsonl:
+            with open(path, 'rb') as f:
+                chunks = [_loads(line) for line in f if line.strip()]
+        else:
+            data = _loads(path.read_bytes())
+            metadata = data.get('metadata', {})
+            chunks = data.get('chunks', [])
+            reuse_embeddings = (
+                metadata.get('embedding_model') == self.config.embedding.model
+                and metadata.get('embedding_dtype', 'fp32') == 'fp32'
+            )
+            if reuse_embeddings and metadata.get('vectors_file'):
+                vectors = self._load_prior_vectors(metadata, path.parent)
+        
+        for idx, chunk in enumerate(chunks):
+            content = chunk['content']
+            chunk_metadata = chunk['metadata']
+            
+            if jsonl:
+                # JSON Lines exports record the model on each embedded line
+                reuse_embeddings = (
+                    chunk_metadata.pop('embedding_model', None) == self.config.embedding.model
+                )
+            
+            if reuse_embeddings:
+                if vectors is not None:
+                    embedding = vectors[chunk.get('vector_index', idx)]
+                else:
+                    embedding = chunk.get('embedding')
+                if embedding is not None and len(embedding):
+                    prior.embeddings[EmbeddingCache.key(content)] = embedding
+            
+            # Only chunks exported with export.incremental carry mtime_ns
+            mtime_ns = chunk_metadata.get('mtime_ns')
+            if mtime_ns is not None:
+                entry = prior.files.setdefault(chunk_metadata['file_path'], {
+                    'mtime_ns': mtime_ns,
+                    'size_bytes': chunk_metadata.get('size_bytes'),
+                    'config_hash': chunk_metadata.get('config_hash'),
+                    'chunks': []
+                })
+                entry['chunks'].append({'content': content, 'metadata': chunk_metadata})
+        
+        self.logger.info(
+            f"♻️  Prior export {path}: {len(prior.embeddings)} embeddings, "
+            f"{len(prior.files)} files"
+        )
+        return prior
+    
+    def _load_prior_vectors(self, metadata: Dict, export_dir: Path):
+        """Prior export's float32 sidecar vectors as an (N, D) array"""
+        import numpy as np
+        
+        return np.load(export_dir / metadata['vectors_file']).astype(np.float32)
+    
     def _export_json(self, chunks: List[Dict]) -> str:
         """Export as JSON"""
         output_file = Path(self.config.paths.export_file)
@@ -34,59 +254,153 @@ class VectorExporter:
         
         self.logger.info(f"📦 Exporting to: {output_file}")
         
-        # Prepare export data
-        export_data = {
-            'metadata': {
-                'agent_name': self.config.project['agent_name'],
-                'project_name': self.config.project['name'],
-                'version': self.config.project['version'],
-                'generated_at': datetime.now().isoformat(),
-                'total_chunks': len(chunks),
-                'embedding_model': self.config.embedding.model
-            },
-            'chunks': []
+        # Prepare export metadata (chunks are streamed to the file below)
+        export_metadata = {
+            'agent_name': self.config.project['agent_name'],
+            'project_name': self.config.project['name'],
+            'version': self.config.project['version'],
+            'generated_at': datetime.now().isoformat(),
+            'total_chunks': len(chunks),
+            'embedding_model': self.config.embedding.model
         }
         
-        # Add chunks
-        for idx, chunk in enumerate(chunks):
-            chunk_data = {
-                'id': f"chunk_{idx}",
-                'content': chunk['content'],
-                'metadata': chunk['metadata']
-            }
-            
-            if self.config.export.get('include_embeddings', True):
-                chunk_data['embedding'] = chunk.get('embedding', [])
-            
-            export_data['chunks'].append(chunk_data)
+        include_embeddings = self.config.export.get('include_embeddings', True)
+        use_sidecar = self.config.export.get('vectors_sidecar', False)
+        storage_dtype = self.config.embedding.storage_dtype
+        
+        # Stack embeddings into one matrix when they are converted or moved
+        vectors = None
+        if include_embeddings and (use_sidecar or storage_dtype != 'fp32'):
+            vectors = self._stack_vectors(chunks, storage_dtype)
+            if vectors is not None:
+                export_metadata['embedding_dtype'] = storage_dtype
+                if storage_dtype == 'int8':
+                    export_metadata['embedding_scale'] = 1 / 127
+        
+        # Optionally move embeddings to a binary sidecar, referenced by index
+        vectors_file = None
+        if use_sidecar and vectors is not None:
+            vectors_file = self._write_vectors(vectors, output_file)
+            export_metadata['vectors_file'] = vectors_file
+        
+        # Compact by default; pretty printing roughly doubles the file size
+        pretty = self.config.export.get('pretty_print', False)
+        separator = b',\n' if pretty else b','
         
-        # Write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            if self.config.export.get('pretty_print', True):
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+        # Stream chunks one at a time; peak memory stays at one encoded chunk
+        with open(output_file, 'wb') as f:
+            if pretty:
+                f.write(b'{"metadata": ' + _dumps(export_metadata, True) + b', "chunks": [')
             else:
-                json.dump(export_data, f, ensure_ascii=False)
+                f.write(b'{"metadata":' + _dumps(export_metadata) + b',"chunks":[')
+            
+            for idx, chunk in enumerate(chunks):
+                chunk_data = {
+                    'id': f"chunk_{idx}",
+                    'content': chunk['content'],
+                    'metadata': chunk['metadata']
+                }
+                
+                if vectors_file:
+                    chunk_data['vector_index'] = idx
+                elif vectors is not None:
+                    if storage_dtype == 'fp16':
+                        chunk_data['embedding'] = _fp16_json_row(vectors[idx])
+                    else:
+                        chunk_data['embedding'] = vectors[idx]
+                elif include_embeddings:
+                    chunk_data['embedding'] = chunk.get('embedding', [])
+                
+                if idx:
+                    f.write(separator)
+                f.write(_dumps(chunk_data, pretty))
+            
+            f.write(b']}\n')
         
         file_size = output_file.stat().st_size / (1024 * 1024)  # MB
         self.logger.success(f"Exported {len(chunks)} chunks ({file_size:.2f} MB)")
         
-        # Generate summary
-        self._generate_summary(export_data, output_file.parent)
+        # Generate summary (only reads chunk metadata)
+        self._generate_summary(
+            {'metadata': export_metadata, 'chunks': chunks},
+            output_file.parent
+        )
         
         return str(output_file)
     
+    def _stack_vectors(self, chunks: List[Dict], storage_dtype: str):
+        """Stack chunk embeddings into one (N, D) array in the storage dtype
+        
+        Returns None when chunks have no embeddings.
+        """
+        if not chunks or 'embedding' not in chunks[0]:
+            return None
+        
+        import numpy as np
+        
+        vectors = np.asarray([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+        
+        if storage_dtype == 'fp16':
+            vectors = vectors.astype(np.float16)
+        elif storage_dtype == 'int8':
+            vectors = _quantize_int8(vectors)
+        
+        return vectors
+    
+    def _write_vectors(self, vectors, output_file: Path) -> str:
+        """Write stacked embeddings as a .npy file next to the export
+        
+        Returns the sidecar file name. Load it with
+        ``np.load(path, mmap_mode='r')``; row i belongs to the chunk with
+        ``vector_index == i``.
+        """
+        import numpy as np
+        
+        vectors_path = output_file.with_suffix('.vectors.npy')
+        np.save(vectors_path, vectors)
+        
+        size_mb = vectors_path.stat().st_size / (1024 * 1024)
+        self.logger.info(f"   🧮 Vectors: {vectors_path} ({size_mb:.2f} MB)")
+        
+        return vectors_path.name
+    
     def _export_jsonl(self, chunks: List[Dict]) -> str:
         """Export as JSON Lines"""
-        output_file = Path(self.config.paths.export_file).with_suffix('.jsonl')
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file = self._jsonl_output_file()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
+        embedding_model = self.config.embedding.model
+        with open(output_file, 'wb') as f:
             for chunk in chunks:
-                json.dump(chunk, f, ensure_ascii=False)
-                f.write('\n')
+                f.write(_jsonl_line(chunk, embedding_model))
         
         return str(output_file)
     
+    @contextmanager
+    def streaming_jsonl_sink(self) -> Iterator[JsonlStreamWriter]:
+        """Open a JSON Lines export that is written while chunks are produced
+        
+        Pass ``writer.submit`` as the ``sink`` of
+        ``CodeVectorizer.generate_embeddings``; the file is complete once
+        the context exits.
+        """
+        output_file = self._jsonl_output_file()
+        self.logger.info(f"📦 Streaming export to: {output_file}")
+        
+        writer = JsonlStreamWriter(output_file, embedding_model=self.config.embedding.model)
+        try:
+            yield writer
+        finally:
+            writer.close()
+        
+        file_size = output_file.stat().st_size / (1024 * 1024)  # MB
+        self.logger.success(f"Exported {writer.written} chunks ({file_size:.2f} MB)")
+    
+    def _jsonl_output_file(self) -> Path:
+        """Path of the JSON Lines export, with its directory created"""
+        output_file = Path(self.config.paths.export_file).with_suffix('.jsonl')
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        return output_file
+    
     def _generate_summary(self, export_data: Dict, output_dir: Path):
         """Generate summary report"""
         summary_file = output_dir / 'cortex_summary.md'
@@ -94,25 +408,23 @@ class VectorExporter:
         chunks = export_data['chunks']
         
         # Calculate statistics
-        layers = {}
-        features = {}
-        patterns = {}
+        layers = Counter()
+        features = Counter()
+        patterns = Counter()
         
         for chunk in chunks:
             metadata = chunk['metadata']
             
-            layer = metadata.get('layer', 'unknown')
-            layers[layer] = layers.get(layer, 0) + 1
+            layers[metadata.get('layer', 'unknown')] += 1
             
             feature = metadata.get('feature')
             if feature:
-                features[feature] = features.get(feature, 0) + 1
+                features[feature] += 1
             
-            for pattern in metadata.get('patterns', []):
-                patterns[pattern] = patterns.get(pattern, 0) + 1
+            patterns.update(metadata.get('patterns', ()))
         
-        # Generate markdown
-        summary = f"""# 🏗️ {export_data['metadata']['agent_name']} Knowledge Base Summary
+        # Generate markdown (parts are joined once at the end)
+        parts = [f"""# 🏗️ {export_data['metadata']['agent_name']} Knowledge Base Summary
 
 ## Project Information
 - **Agent**: {export_data['metadata']['agent_name']}
@@ -124,29 +436,26 @@ class VectorExporter:
 ## Architecture Layers
 | Layer | Chunks |
 |-------|--------|
-"""
-        for layer, count in sorted(layers.items(), key=lambda x: x[1], reverse=True):
-            summary += f"| {layer} | {count} |\n"
+"""]
+        parts.extend(f"| {layer} | {count} |\n" for layer, count in layers.most_common())
         
         if features:
-            summary += f"""
+            parts.append("""
 ## Features Detected
 | Feature | Chunks |
 |---------|--------|
-"""
-            for feature, count in sorted(features.items(), key=lambda x: x[1], reverse=True)[:10]:
-                summary += f"| {feature} | {count} |\n"
+""")
+            parts.extend(f"| {feature} | {count} |\n" for feature, count in features.most_common(10))
         
         if patterns:
-            summary += f"""
+            parts.append("""
 ## Patterns Found
 | Pattern | Occurrences |
 |---------|-------------|
-"""
-            for pattern, count in sorted(patterns.items(), key=lambda x: x[1], reverse=True):
-                summary += f"| {pattern} | {count} |\n"
+""")
+            parts.extend(f"| {pattern} | {count} |\n" for pattern, count in patterns.most_common())
         
-        summary += f"""
+        parts.append(f"""
 ## Usage Instructions
 
 ### 1. Upload to Vector Database
@@ -181,10 +490,10 @@ Try asking:
 
 ---
 *Generated by CodeArchitect AI - Empowering architectural decisions with AI*
-"""
+""")
         
         with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write(summary)
+            f.write(''.join(parts))
         
         self.logger.success(f"Summary generated: {summary_file}")
 
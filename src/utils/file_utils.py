@@ -1,8 +1,15 @@
 """
 File utility functions
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, List, Optional, Tuple
+import mmap
+import os
+
+
+# Files larger than this are decoded straight from a memory map
+MMAP_THRESHOLD = 256 * 1024
 
 
 def get_file_size_mb(file_path: Path) -> float:
@@ -15,40 +22,142 @@ def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def read_file_safe(file_path: Path) -> str:
-    """Read file with fallback encoding"""
+def _decode(data) -> str:
+    """Decode UTF-8, falling back to latin-1 (which accepts any byte)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return str(data, 'utf-8')
     except UnicodeDecodeError:
-        with open(file_path, 'r', encoding='latin-1') as f:
-            return f.read()
+        return str(data, 'latin-1')
+
+
+def read_file_safe(file_path: Path, size_bytes: Optional[int] = None) -> str:
+    """Read file with fallback encoding
+    
+    The file is read as bytes once and decoded as UTF-8, falling back to
+    latin-1. Files above ``MMAP_THRESHOLD`` are decoded from a read-only
+    memory map, so no intermediate bytes copy is held next to the text.
+    Line endings are normalized to ``\\n`` like text-mode ``open`` does.
+    
+    ``size_bytes`` can be passed when already known to skip a ``stat``.
+    """
+    file_path = Path(file_path)
+    if size_bytes is None:
+        size_bytes = file_path.stat().st_size
+    
+    if size_bytes > MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            content = _decode(mapped)
+    else:
+        content = _decode(file_path.read_bytes())
+    
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def build_ignore_spec(patterns: List[str], gitignore_file: Optional[Path] = None):
+    """Compile gitignore-style patterns, plus a .gitignore file, into one matcher
+    
+    Returns None when there is nothing to match. Requires ``pathspec``,
+    which is only imported when there are patterns.
+    """
+    lines = list(patterns)
+    if gitignore_file is not None and gitignore_file.is_file():
+        lines.extend(read_file_safe(gitignore_file).splitlines())
+    
+    if not lines:
+        return None
+    
+    import pathspec
+    
+    return pathspec.GitIgnoreSpec.from_lines(lines)
+
+
+def _scan_directory(
+    directory: str,
+    extensions: FrozenSet[str],
+    ignore_dirs: FrozenSet[str],
+    ignore_files: FrozenSet[str],
+    ignore_spec=None,
+    root_prefix: int = 0
+) -> Tuple[List[str], List[str]]:
+    """List matching files and subdirectories to descend into
+    
+    ``ignore_spec`` is matched against paths relative to the scan root,
+    which start at ``root_prefix`` in each entry path.
+    """
+    files = []
+    subdirs = []
+    
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Ignored directories are pruned here, never descended into
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in ignore_dirs and not (
+                        ignore_spec is not None
+                        and ignore_spec.match_file(_relative(entry.path, root_prefix) + '/')
+                    ):
+                        subdirs.append(entry.path)
+                elif (
+                    entry.name not in ignore_files
+                    and os.path.splitext(entry.name)[1] in extensions
+                    and entry.is_file()
+                    and not (
+                        ignore_spec is not None
+                        and ignore_spec.match_file(_relative(entry.path, root_prefix))
+                    )
+                ):
+                    files.append(entry.path)
+    except OSError:
+        pass  # Unreadable directory, skip it like rglob does
+    
+    return files, subdirs
+
+
+def _relative(path: str, root_prefix: int) -> str:
+    """Path below the scan root, with forward slashes"""
+    relative = path[root_prefix:]
+    return relative.replace(os.sep, '/') if os.sep != '/' else relative
 
 
 def scan_code_files(
     root: Path,
     extensions: List[str],
     ignore_dirs: List[str],
-    ignore_files: List[str]
+    ignore_files: List[str],
+    max_workers: int = 16,
+    ignore_spec=None
 ) -> List[Path]:
-    """Scan directory for code files"""
+    """Scan directory for code files
+    
+    Directories are listed with os.scandir by a thread pool, one tree level
+    at a time, which hides per-directory latency on network filesystems.
+    ``ignore_spec`` (see ``build_ignore_spec``) additionally skips files and
+    prunes directories matching gitignore-style patterns.
+    """
     files = []
-    extensions_set = set(extensions)
-    ignore_dirs_set = set(ignore_dirs)
-    ignore_files_set = set(ignore_files)
-    
-    for file_path in root.rglob('*'):
-        # Skip ignored directories
-        if any(ignored in file_path.parts for ignored in ignore_dirs_set):
-            continue
-        
-        # Skip ignored files
-        if file_path.name in ignore_files_set:
-            continue
-        
-        # Check extension
-        if file_path.is_file() and file_path.suffix in extensions_set:
-            files.append(file_path)
-    
-    return sorted(files)
-
+    # Built once and shared read-only by every scanning thread
+    extensions_set = frozenset(extensions)
+    ignore_dirs_set = frozenset(ignore_dirs)
+    ignore_files_set = frozenset(ignore_files)
+    
+    pending = [str(root)]
+    root_prefix = len(os.path.join(str(root), ''))
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending:
+            level = executor.map(
+                lambda directory: _scan_directory(
+                    directory, extensions_set, ignore_dirs_set, ignore_files_set,
+                    ignore_spec, root_prefix
+                ),
+                pending
+            )
+            pending = []
+            for level_files, subdirs in level:
+                files.extend(level_files)
+                pending.extend(subdirs)
+    
+    return sorted(Path(file_path) for file_path in files)
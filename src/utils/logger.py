@@ -61,8 +61,9 @@ class CortexLogger:
     def info(self, message: str):
         self.logger.info(message)
     
-    def debug(self, message: str):
-        self.logger.debug(message)
+    def debug(self, message: str, *args):
+        """Debug message, %-formatted with ``args`` only if DEBUG is enabled"""
+        self.logger.debug(message, *args)
     
     def warning(self, message: str):
         self.logger.warning(message)
@@ -74,7 +75,7 @@ class CortexLogger:
         """Custom success level"""
         self.logger.info(f"✅ {message}")
     
-    def processing(self, message: str):
-        """Custom processing level"""
-        self.logger.info(f"⚙️  {message}")
+    def processing(self, message: str, *args):
+        """Custom processing level (``args`` are %-formatted lazily)"""
+        self.logger.info("⚙️  " + message, *args)
 
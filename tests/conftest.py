@@ -0,0 +1,28 @@
+"""
+Shared fixtures
+"""
+from pathlib import Path
+
+import pytest
+
+from config.config_schema import Config
+
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'config'
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """OpenAI config with source, output and export paths under tmp_path"""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+
+    config = Config.from_yaml(str(CONFIG_DIR / 'openai.yaml'))
+
+    source = tmp_path / 'src'
+    source.mkdir()
+    config.paths.source_code = str(source)
+    config.paths.output_dir = str(tmp_path / 'output')
+    config.paths.export_file = str(tmp_path / 'output' / 'knowledge_base.json')
+    config.logging = {'level': 'WARNING', 'console_output': False}
+
+    return config
@@ -0,0 +1,101 @@
+"""
+Tests for splitting OpenAI Batch API jobs
+"""
+import json
+from types import SimpleNamespace
+
+from src.core.vectorizer import CodeVectorizer
+
+
+class FakeOpenAI:
+    """Records uploaded request files and the batch jobs started from them"""
+
+    def __init__(self):
+        self.uploads = []
+        self.files = SimpleNamespace(create=self._create_file)
+        self.batches = SimpleNamespace(create=self._create_batch)
+
+    def _create_file(self, file, purpose):
+        self.uploads.append(file.read())
+        return SimpleNamespace(id=f'file-{len(self.uploads)}')
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id=f'batch-{input_file_id}')
+
+    def requests(self):
+        """Decoded requests of each uploaded file"""
+        return [
+            [json.loads(line) for line in upload.decode('utf-8').splitlines()]
+            for upload in self.uploads
+        ]
+
+
+def make_vectorizer(config, batch_size=2):
+    config.embedding.batch_size = batch_size
+    vectorizer = CodeVectorizer(config)
+    vectorizer.embedder = FakeOpenAI()
+    return vectorizer
+
+
+def make_chunks(count):
+    return [{'content': f'chunk {i} ' + 'x' * i, 'metadata': {}} for i in range(count)]
+
+
+def test_single_job_under_limits(config):
+    vectorizer = make_vectorizer(config)
+
+    batch_ids = vectorizer._submit_embedding_batches(make_chunks(11))
+
+    assert batch_ids == ['batch-file-1']
+    requests = vectorizer.embedder.requests()[0]
+    assert [request['custom_id'] for request in requests] == ['0', '2', '4', '6', '8', '10']
+
+
+def test_jobs_split_by_input_count(config):
+    vectorizer = make_vectorizer(config)
+    vectorizer.BATCH_API_MAX_INPUTS = 5
+    chunks = make_chunks(11)
+
+    batch_ids = vectorizer._submit_embedding_batches(chunks)
+
+    jobs = vectorizer.embedder.requests()
+    assert len(batch_ids) == len(jobs) == 3
+
+    # Requests are never split, and no job goes over the input limit
+    inputs = [sum(len(request['body']['input']) for request in job) for job in jobs]
+    assert inputs == [4, 4, 3]
+
+    # custom_id stays the index of the first chunk in the full list
+    texts = [
+        (int(request['custom_id']) + i, text)
+        for job in jobs
+        for request in job
+        for i, text in enumerate(request['body']['input'])
+    ]
+    assert texts == [(i, chunk['content']) for i, chunk in enumerate(chunks)]
+
+
+def test_jobs_split_by_file_size(config):
+    vectorizer = make_vectorizer(config, batch_size=1)
+    chunks = make_chunks(6)
+
+    vectorizer._submit_embedding_batches(chunks)
+    line_size = max(len(line) + 1 for line in vectorizer.embedder.uploads[0].splitlines())
+
+    vectorizer.embedder = FakeOpenAI()
+    vectorizer.BATCH_API_MAX_FILE_BYTES = 2 * line_size
+    vectorizer._submit_embedding_batches(chunks)
+
+    uploads = vectorizer.embedder.uploads
+    assert len(uploads) == 3
+    assert all(len(upload) <= 2 * line_size for upload in uploads)
+    assert [len(job) for job in vectorizer.embedder.requests()] == [2, 2, 2]
+
+
+def test_requests_file_is_removed(config, tmp_path):
+    vectorizer = make_vectorizer(config)
+    vectorizer.BATCH_API_MAX_INPUTS = 3
+
+    vectorizer._submit_embedding_batches(make_chunks(7))
+
+    assert not list((tmp_path / 'output').glob('.batch_api*'))
@@ -0,0 +1,76 @@
+"""
+Tests for SmartCodeChunker's JavaScript block splitting
+"""
+from src.core.chunk_strategy import SmartCodeChunker
+
+
+def split(content: str):
+    # Small chunk size so every top-level block stays separate
+    return list(SmartCodeChunker(chunk_size=1000)._split_by_constructs(content))
+
+
+def test_splits_top_level_declarations():
+    blocks = split(
+        "function a() {\n  return 1;\n}\n\n"
+        "const b = 2;\n\n"
+        "export class C {}\n"
+    )
+
+    assert [block.split()[0] for block in blocks] == ['function', 'const', 'export']
+
+
+def test_nested_declarations_are_not_cut_points():
+    blocks = split(
+        "function outer() {\n"
+        "const inner = () => {\n  return 1;\n};\n"
+        "}\n\n"
+        "const after = 1;\n"
+    )
+
+    assert len(blocks) == 2
+    assert blocks[1] == "const after = 1;"
+
+
+def test_braces_in_strings_are_ignored():
+    blocks = split(
+        "function a() {\n  return '{' + \"{{\";\n}\n\n"
+        "function b() {\n  return 2;\n}\n\n"
+        "function c() {\n  return 3;\n}\n"
+    )
+
+    assert len(blocks) == 3
+    assert blocks[1].startswith('function b')
+    assert blocks[2].startswith('function c')
+
+
+def test_braces_in_comments_are_ignored():
+    blocks = split(
+        "function a() {\n  // closes } and opens {\n  /* { */\n  return 1;\n}\n\n"
+        "const b = 2;\n"
+    )
+
+    assert len(blocks) == 2
+    assert blocks[1] == "const b = 2;"
+
+
+def test_template_literals_are_skipped_whole():
+    blocks = split(
+        "const t = `\n${'{'}\nconst notACut = 1\n`;\n\n"
+        "const b = 2;\n"
+    )
+
+    assert len(blocks) == 2
+    assert 'notACut' in blocks[0]
+    assert blocks[1] == "const b = 2;"
+
+
+def test_column_zero_brace_recovers_from_regex_literal():
+    # A brace inside a regex literal can't be told apart from code, but
+    # the closing brace in column 0 ends the function anyway
+    blocks = split(
+        "function a() {\n  return /\\{/.test(s);\n}\n\n"
+        "function b() {\n  return 2;\n}\n"
+    )
+
+    assert len(blocks) == 2
+    assert blocks[1].startswith('function b')
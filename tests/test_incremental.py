@@ -0,0 +1,142 @@
+"""
+Tests for incremental runs: load_prior -> process_codebase(prior_files=...)
+"""
+import pickle
+
+import pytest
+
+from src.core.embedding_cache import EmbeddingCache
+from src.core.vectorizer import CodeVectorizer
+from src.exporters.vector_exporter import VectorExporter
+
+
+SOURCE = '''import React from 'react';
+
+export function Greeting({ name }) {
+  return <Text>Hello {name}</Text>;
+}
+
+export const styles = StyleSheet.create({});
+'''
+
+EMBEDDING = [0.123456, 0.654321]
+
+
+@pytest.fixture
+def incremental_config(config, tmp_path):
+    config.export['incremental'] = True
+    (tmp_path / 'src' / 'screens').mkdir()
+    (tmp_path / 'src' / 'screens' / 'Greeting.tsx').write_text(SOURCE, encoding='utf-8')
+    (tmp_path / 'src' / 'api.js').write_text("export const get = () => fetch('/x');\n", encoding='utf-8')
+    return config
+
+
+def first_run(config):
+    """Process the source tree and export it with fixed embeddings"""
+    vectorizer = CodeVectorizer(config)
+    chunks = vectorizer.process_codebase()
+    exporter = VectorExporter(config, vectorizer.logger)
+    exporter.export([{**chunk, 'embedding': EMBEDDING} for chunk in chunks])
+    return chunks
+
+
+def second_run(config):
+    vectorizer = CodeVectorizer(config)
+    prior = VectorExporter(config, vectorizer.logger).load_prior()
+    chunks = vectorizer.process_codebase(prior_files=prior.files)
+    return vectorizer, prior, chunks
+
+
+@pytest.mark.parametrize('export_format', ['json', 'jsonl'])
+def test_unchanged_files_reuse_chunks_and_embeddings(incremental_config, export_format):
+    incremental_config.export['format'] = export_format
+    first = first_run(incremental_config)
+
+    vectorizer, prior, chunks = second_run(incremental_config)
+
+    assert vectorizer.get_stats()['files_unchanged'] == 2
+    assert vectorizer.get_stats()['files_processed'] == 0
+    assert [chunk['content'] for chunk in chunks] == [chunk['content'] for chunk in first]
+    assert 'embedding_model' not in chunks[0]['metadata']
+    assert len(prior.embeddings) == len(first)
+    assert all(list(embedding) == EMBEDDING for embedding in prior.embeddings.values())
+
+
+@pytest.mark.parametrize('change', [
+    lambda config: setattr(config.code_processing.chunking, 'chunk_size', 200),
+    lambda config: config.metadata.update(extract_imports=False),
+    lambda config: config.architecture['layers'].update(screens=['screens']),
+])
+def test_config_change_reprocesses_files(incremental_config, change):
+    first_run(incremental_config)
+
+    change(incremental_config)
+    vectorizer, prior, chunks = second_run(incremental_config)
+
+    assert len(prior.files) == 2
+    assert vectorizer.get_stats()['files_unchanged'] == 0
+    assert vectorizer.get_stats()['files_processed'] == 2
+
+
+@pytest.mark.parametrize('export_format', ['json', 'jsonl'])
+def test_model_change_drops_prior_embeddings(incremental_config, export_format):
+    incremental_config.export['format'] = export_format
+    first_run(incremental_config)
+
+    incremental_config.embedding.model = 'text-embedding-3-large'
+    vectorizer, prior, chunks = second_run(incremental_config)
+
+    assert prior.embeddings == {}
+    # Chunking doesn't depend on the model, so files are still reused
+    assert vectorizer.get_stats()['files_unchanged'] == 2
+
+
+@pytest.mark.parametrize('storage_dtype', ['fp16', 'int8'])
+def test_lossy_exports_are_not_reused(incremental_config, storage_dtype):
+    incremental_config.embedding.storage_dtype = storage_dtype
+    first_run(incremental_config)
+
+    _, prior, _ = second_run(incremental_config)
+
+    assert prior.embeddings == {}
+
+
+def test_fp32_sidecar_vectors_are_reused(incremental_config):
+    incremental_config.export['vectors_sidecar'] = True
+    first = first_run(incremental_config)
+
+    _, prior, _ = second_run(incremental_config)
+
+    assert len(prior.embeddings) == len(first)
+    for embedding in prior.embeddings.values():
+        assert embedding.tolist() == pytest.approx(EMBEDDING)
+
+
+def test_reused_files_keep_analyzer_cache(incremental_config, tmp_path):
+    first_run(incremental_config)
+    second_run(incremental_config)
+
+    with open(tmp_path / 'output' / '.analyzer_cache.pkl', 'rb') as f:
+        entries = pickle.load(f)['entries']
+
+    assert sorted(key[0].rsplit('/', 1)[-1] for key in entries) == ['Greeting.tsx', 'api.js']
+
+
+def test_cache_wins_over_prior(config, monkeypatch):
+    config.embedding.cache_embeddings = True
+    vectorizer = CodeVectorizer(config)
+    chunks = [{'content': 'const a = 1;', 'metadata': {}}]
+    key = EmbeddingCache.key(chunks[0]['content'])
+
+    cache_file = vectorizer.config.paths.output_dir + '/.embedding_cache.sqlite'
+    with EmbeddingCache(cache_file, config.embedding.model) as cache:
+        cache.put_many({key: EMBEDDING})
+
+    def embed(*args, **kwargs):
+        raise AssertionError("known content must not be embedded again")
+    monkeypatch.setattr(vectorizer, '_embed_with_provider', embed)
+
+    # A dequantized vector from an older export loses to the exact one
+    enriched = vectorizer.generate_embeddings(chunks, prior={key: [0.12598425, 0.6535433]})
+
+    assert enriched[0]['embedding'] == pytest.approx(EMBEDDING)